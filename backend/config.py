@@ -21,5 +21,37 @@ class Config:
     # TTL Settings for Redis (in seconds)
     CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))  # 1 hour default
 
+    # User risk history
+    HISTORY_TTL_DAYS = int(os.getenv("HISTORY_TTL_DAYS", "90"))  # detection log retention
+    PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", "30"))  # seconds, in-process and Redis
+    PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+    PROFILE_LOOKUP_TIMEOUT = float(os.getenv("PROFILE_LOOKUP_TIMEOUT", "0.1"))  # seconds per uncached read
+    PROFILE_FAILURE_BACKOFF = float(os.getenv("PROFILE_FAILURE_BACKOFF", "5"))  # seconds to skip lookups after a failure
+
+    # Streaming text analysis (per WebSocket connection)
+    STREAM_MESSAGE_RATE = float(os.getenv("STREAM_MESSAGE_RATE", "20"))  # messages per second
+    STREAM_MESSAGE_BURST = int(os.getenv("STREAM_MESSAGE_BURST", "50"))
+
+    # Image upload budgets
+    IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+    IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", "40000000"))
+    IMAGE_THUMBNAIL_SIZE = int(os.getenv("IMAGE_THUMBNAIL_SIZE", "256"))
+    IMAGE_CACHE_SIZE = int(os.getenv("IMAGE_CACHE_SIZE", "256"))
+
+    # Audio feature extraction
+    AUDIO_FRAME_SIZE = int(os.getenv("AUDIO_FRAME_SIZE", "2048"))  # samples per frame
+    AUDIO_PCM_SAMPLE_RATE = int(os.getenv("AUDIO_PCM_SAMPLE_RATE", "16000"))  # for raw PCM uploads
+    AUDIO_MAX_SECONDS = float(os.getenv("AUDIO_MAX_SECONDS", "1800"))  # longest clip analyzed
+    AUDIO_MAX_BYTES = int(os.getenv("AUDIO_MAX_BYTES", str(512 * 1024 * 1024)))  # backstop on upload size
+    AUDIO_MAX_CHANNELS = int(os.getenv("AUDIO_MAX_CHANNELS", "8"))
+
+    # Early-exit scoring cascade (see backend/integrations/cascade.py)
+    # Defaults hold ~99% precision on 30% held-out splits of spam.csv (SMS text only)
+    CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "true").lower() in ("1", "true", "yes")
+    CASCADE_BENIGN_THRESHOLD = float(os.getenv("CASCADE_BENIGN_THRESHOLD", "0.12"))
+    CASCADE_FRAUD_THRESHOLD = float(os.getenv("CASCADE_FRAUD_THRESHOLD", "0.45"))
+    CASCADE_CACHE_SIZE = int(os.getenv("CASCADE_CACHE_SIZE", "10000"))
+    CASCADE_HISTORY_FRAUD_RATE = float(os.getenv("CASCADE_HISTORY_FRAUD_RATE", "0.2"))  # no benign early exit above this
+
     # Environment
     ENV = os.getenv("ENV", "development")
\ No newline at end of file
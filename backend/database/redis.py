@@ -1,14 +1,20 @@
-import redis.asyncio as redis
 import logging
+from typing import TYPE_CHECKING
 from backend.config import Config
 
+if TYPE_CHECKING:
+    import redis.asyncio as redis
+
 logger = logging.getLogger(__name__)
 
 class RedisConnection:
     def __init__(self):
-        self.client: redis.Redis = None
+        self.client: "redis.Redis" = None
 
     async def connect(self):
+        # Lazy import so the app can start (and answer liveness) without redis installed
+        import redis.asyncio as redis
+
         try:
             self.client = redis.Redis.from_url(
                 Config.REDIS_URL,
@@ -29,7 +35,7 @@ class RedisConnection:
             await self.client.aclose()
             logger.info("Redis connection closed")
 
-    def get_client(self) -> redis.Redis:
+    def get_client(self) -> "redis.Redis":
         if not self.client:
             raise RuntimeError("Redis client not initialized. Call connect() first.")
         return self.client
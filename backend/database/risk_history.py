@@ -0,0 +1,269 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+from backend.config import Config
+from backend.database.mongodb import mongodb_conn
+from backend.database.redis import redis_conn
+from backend.models.schemas import DetectionLog, RiskLevel, RiskScore
+
+logger = logging.getLogger(__name__)
+
+USERS = "users"
+DETECTION_LOGS = "detection_logs"
+RISK_SCORES = "risk_scores"
+
+PROFILE_KEY = "risk_profile:{}"
+
+
+def _risk_level(score: float) -> RiskLevel:
+    """Map a 0-100 API risk score onto the stored RiskLevel enum."""
+    if score >= 85:
+        return RiskLevel.CRITICAL
+    if score >= 60:
+        return RiskLevel.HIGH
+    if score >= 30:
+        return RiskLevel.MEDIUM
+    return RiskLevel.LOW
+
+
+def _public_profile(stored: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a stored UserData.risk_profile for scoring (JSON-safe, with derived rates)."""
+    total = int(stored.get("total_events", 0))
+    fraud = int(stored.get("fraud_events", 0))
+    last_seen = stored.get("last_seen")
+    return {
+        "total_events": total,
+        "fraud_events": fraud,
+        "fraud_rate": fraud / total if total else 0.0,
+        "avg_score": float(stored.get("score_sum", 0.0)) / total if total else 0.0,
+        "max_score": float(stored.get("max_score", 0.0)),
+        "last_score": float(stored.get("last_score", 0.0)),
+        "last_seen": last_seen.isoformat() if isinstance(last_seen, datetime) else last_seen,
+    }
+
+
+class RiskHistoryStore:
+    """Per-user risk history on top of mongodb_conn, cached in-process and in Redis.
+
+    Every call degrades to a no-op when MongoDB is not connected, so scoring
+    never depends on history being available.
+    """
+
+    def __init__(
+        self,
+        cache_ttl: int = Config.PROFILE_CACHE_TTL,
+        cache_size: int = Config.PROFILE_CACHE_SIZE,
+        lookup_timeout: float = Config.PROFILE_LOOKUP_TIMEOUT,
+        failure_backoff: float = Config.PROFILE_FAILURE_BACKOFF,
+    ):
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.lookup_timeout = lookup_timeout
+        self.failure_backoff = failure_backoff
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._backoff_until = 0.0
+
+    @property
+    def db(self):
+        return mongodb_conn.db
+
+    async def ensure_indexes(self):
+        """Create lookup and TTL indexes. Safe to call on every startup."""
+        if self.db is None:
+            return
+        ttl_seconds = Config.HISTORY_TTL_DAYS * 86400
+        await self.db[USERS].create_index("user_id", unique=True)
+        for name in (DETECTION_LOGS, RISK_SCORES):
+            await self.db[name].create_index([("user_id", 1), ("timestamp", -1)])
+            await self.db[name].create_index("timestamp", expireAfterSeconds=ttl_seconds)
+        logger.info("Risk history indexes ensured")
+
+    # -- cache ----------------------------------------------------------
+
+    def _local_get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        item = self._local.get(user_id)
+        if item is None:
+            return None
+        expires, profile = item
+        if time.monotonic() > expires:
+            self._local.pop(user_id, None)
+            return None
+        self._local.move_to_end(user_id)
+        return profile
+
+    def _local_put(self, user_id: str, profile: Dict[str, Any]):
+        self._local[user_id] = (time.monotonic() + self.cache_ttl, profile)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.cache_size:
+            self._local.popitem(last=False)
+
+    async def _cache_profile(self, user_id: str, profile: Dict[str, Any]):
+        self._local_put(user_id, profile)
+        if redis_conn.client is None:
+            return
+        try:
+            await redis_conn.set_with_ttl(PROFILE_KEY.format(user_id), json.dumps(profile), self.cache_ttl)
+        except Exception as e:
+            logger.debug(f"Failed to cache risk profile in Redis: {e}")
+
+    async def invalidate(self, user_id: str):
+        self._local.pop(user_id, None)
+        if redis_conn.client is None:
+            return
+        try:
+            await redis_conn.delete(PROFILE_KEY.format(user_id))
+        except Exception as e:
+            logger.debug(f"Failed to invalidate cached risk profile: {e}")
+
+    # -- read path ------------------------------------------------------
+
+    async def get_profile(self, user_id: Optional[str]) -> Dict[str, Any]:
+        """Return the user's risk profile, or {} if unknown or history is unavailable.
+
+        Uncached reads get lookup_timeout seconds. After a timeout or error,
+        lookups are skipped for failure_backoff seconds so a down MongoDB
+        does not add latency to every request.
+        """
+        if not user_id:
+            return {}
+        profile = self._local_get(user_id)
+        if profile is not None:
+            return profile
+        if time.monotonic() < self._backoff_until:
+            return {}
+        try:
+            return await asyncio.wait_for(self._load_profile(user_id), self.lookup_timeout)
+        except Exception as e:
+            self._backoff_until = time.monotonic() + self.failure_backoff
+            logger.warning(f"Risk profile lookup failed ({type(e).__name__}); skipping history for {self.failure_backoff:.0f}s")
+            return {}
+
+    async def _load_profile(self, user_id: str) -> Dict[str, Any]:
+        key = PROFILE_KEY.format(user_id)
+        if redis_conn.client is not None:
+            try:
+                cached = await redis_conn.get(key)
+                if cached is not None:
+                    profile = json.loads(cached)
+                    self._local_put(user_id, profile)
+                    return profile
+            except Exception as e:
+                logger.debug(f"Redis risk profile lookup failed: {e}")
+
+        if self.db is None:
+            return {}
+        doc = await self.db[USERS].find_one({"user_id": user_id}, {"risk_profile": 1, "_id": 0})
+        profile = _public_profile(doc.get("risk_profile") or {}) if doc else {}
+        await self._cache_profile(user_id, profile)
+        return profile
+
+    async def recent_detections(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent detection logs for a user, newest first (served by the compound index)."""
+        if self.db is None:
+            return []
+        cursor = self.db[DETECTION_LOGS].find({"user_id": user_id}, {"_id": 0}).sort("timestamp", -1).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def summarize(self, user_id: str, days: int = 30) -> Dict[str, Any]:
+        """Aggregate a user's detections over the last `days` days (scores on the API's 0-100 scale)."""
+        if self.db is None:
+            return {}
+        since = datetime.utcnow() - timedelta(days=days)
+        pipeline = [
+            {"$match": {"user_id": user_id, "timestamp": {"$gte": since}}},
+            {"$group": {
+                "_id": None,
+                "events": {"$sum": 1},
+                "fraud_events": {"$sum": {"$cond": ["$prediction", 1, 0]}},
+                "avg_score": {"$avg": "$risk_score"},
+                "max_score": {"$max": "$risk_score"},
+            }},
+            {"$project": {"_id": 0}},
+        ]
+        rows = await self.db[DETECTION_LOGS].aggregate(pipeline).to_list(length=1)
+        if not rows:
+            return {"events": 0, "fraud_events": 0, "avg_score": None, "max_score": None}
+        summary = rows[0]
+        # Stored documents use 0-1; callers see the same scale as get_profile
+        for field in ("avg_score", "max_score"):
+            if summary.get(field) is not None:
+                summary[field] = summary[field] * 100.0
+        return summary
+
+    # -- write path -----------------------------------------------------
+
+    async def record(
+        self,
+        user_id: Optional[str],
+        risk_score: float,
+        is_fraud: bool,
+        source: str,
+        model_version: str = "unknown",
+        transaction_id: Optional[str] = None,
+        features: Optional[Dict[str, Any]] = None,
+    ):
+        """Log a scored event and roll it into the user's risk profile.
+
+        risk_score is on the API's 0-100 scale; stored documents use 0-1 to
+        match the DetectionLog/RiskScore schemas. is_fraud is the route's own
+        verdict. The updated profile is written through to both caches, so
+        active users keep hitting them.
+        """
+        if not user_id or self.db is None:
+            return
+        score = max(0.0, min(100.0, float(risk_score)))
+        now = datetime.utcnow()
+        features = {"source": source, **(features or {})}
+        try:
+            doc = await self.db[USERS].find_one_and_update(
+                {"user_id": user_id},
+                {
+                    "$inc": {
+                        "risk_profile.total_events": 1,
+                        "risk_profile.fraud_events": 1 if is_fraud else 0,
+                        "risk_profile.score_sum": score,
+                        f"risk_profile.sources.{source}": 1,
+                    },
+                    "$set": {"risk_profile.last_score": score, "risk_profile.last_seen": now},
+                    "$max": {"risk_profile.max_score": score},
+                    "$setOnInsert": {"registration_date": now, "flags": []},
+                },
+                projection={"risk_profile": 1, "_id": 0},
+                upsert=True,
+                return_document=True,  # pymongo.ReturnDocument.AFTER
+            )
+            log = DetectionLog(
+                user_id=user_id,
+                transaction_id=transaction_id or str(uuid.uuid4()),
+                risk_score=score / 100.0,
+                risk_level=_risk_level(score),
+                features=features,
+                prediction=bool(is_fraud),
+                timestamp=now,
+                model_version=model_version,
+            )
+            log_doc = log.model_dump(exclude={"id"})
+            log_doc["risk_level"] = log.risk_level.value
+            entry = RiskScore(
+                user_id=user_id,
+                score=score / 100.0,
+                factors={k: float(v) for k, v in features.items() if isinstance(v, (int, float)) and not isinstance(v, bool)},
+                timestamp=now,
+                model_version=model_version,
+            )
+            await self.db[DETECTION_LOGS].insert_one(log_doc)
+            await self.db[RISK_SCORES].insert_one(entry.model_dump(exclude={"id"}))
+        except Exception as e:
+            logger.warning(f"Failed to record risk history for {user_id}: {e}")
+            return
+        await self._cache_profile(user_id, _public_profile((doc or {}).get("risk_profile") or {}))
+
+
+# global instance
+risk_history = RiskHistoryStore()
@@ -0,0 +1,305 @@
+import logging
+import math
+import struct
+from typing import Optional, Dict, Any
+
+from backend.config import Config
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 64 * 1024
+# Upper bound on one analysis frame and on the bytes decoded in one step, so
+# client-controlled header fields (channels, frame size) cannot inflate memory
+MAX_FRAME_BYTES = 256 * 1024
+DECODE_BLOCK_BYTES = 256 * 1024
+RAW_PCM_EXTENSIONS = {".pcm", ".raw"}
+
+# WAVE format tags
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+SILENCE_RMS = 0.01  # -40 dBFS
+CLIP_LEVEL = 0.999
+ROLLOFF = 0.85
+
+
+class AudioRejected(ValueError):
+    """Raised when an audio upload cannot be decoded or exceeds its budget."""
+
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.status_code = status_code
+
+
+class RunningStat:
+    """Count/mean/std/min/max over batches of values without keeping them."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.total_sq += float((values.astype("float64") ** 2).sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"mean": 0.0, "std": 0.0, "min": 0.0, "max": 0.0}
+        mean = self.total / self.count
+        var = max(0.0, self.total_sq / self.count - mean * mean)
+        return {"mean": mean, "std": math.sqrt(var), "min": self.min, "max": self.max}
+
+
+class StreamingAudioAnalyzer:
+    """Incremental WAV/PCM decoder that keeps frame-level feature statistics.
+
+    Feed upload chunks as they arrive with feed(), then call finish() for a
+    compact summary. Only the header and at most one partial frame are
+    buffered, so peak memory does not depend on clip length.
+    """
+
+    def __init__(
+        self,
+        raw: bool = False,
+        sample_rate: Optional[int] = None,
+        channels: int = 1,
+        frame_size: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+    ):
+        # Lazy import so the API still starts without NumPy installed
+        import numpy as np
+
+        self._np = np
+        self.frame_size = frame_size or Config.AUDIO_FRAME_SIZE
+        self.max_bytes = max_bytes or Config.AUDIO_MAX_BYTES
+        self.max_seconds = max_seconds or Config.AUDIO_MAX_SECONDS
+        self.container = "pcm" if raw else "wav"
+        self.format_tag: Optional[int] = None
+        self.sample_rate: Optional[int] = None
+        self.channels: Optional[int] = None
+        self.bits_per_sample: Optional[int] = None
+        self.bytes_read = 0
+        self.samples = 0
+
+        self._buf = bytearray()
+        self._state = "data" if raw else "riff"
+        self._skip = 0  # bytes of a non-audio chunk still to discard
+        self._data_left: Optional[int] = None  # None = until end of stream
+
+        if raw:
+            self._set_format(WAVE_FORMAT_PCM, channels, sample_rate or Config.AUDIO_PCM_SAMPLE_RATE, 16)
+
+        self._window = np.hanning(self.frame_size).astype("float32")
+        self._freqs = None
+        self._frames = 0
+        self._silent_frames = 0
+        self._clipped = 0
+        self._rms = RunningStat()
+        self._zcr = RunningStat()
+        self._centroid = RunningStat()
+        self._flatness = RunningStat()
+        self._rolloff = RunningStat()
+
+    # -- header parsing -------------------------------------------------
+
+    def _set_format(self, tag: int, channels: int, sample_rate: int, bits: int):
+        if tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+            raise AudioRejected(f"Unsupported WAV encoding (format tag {tag:#x})", status_code=415)
+        if tag == WAVE_FORMAT_PCM and bits not in (8, 16, 24, 32):
+            raise AudioRejected(f"Unsupported PCM bit depth: {bits}", status_code=415)
+        if tag == WAVE_FORMAT_IEEE_FLOAT and bits != 32:
+            raise AudioRejected(f"Unsupported float bit depth: {bits}", status_code=415)
+        if channels <= 0 or sample_rate <= 0:
+            raise AudioRejected("Invalid WAV header")
+        if channels > Config.AUDIO_MAX_CHANNELS:
+            raise AudioRejected(f"Audio has {channels} channels; at most {Config.AUDIO_MAX_CHANNELS} are supported", status_code=415)
+        if self.frame_size * channels * (bits // 8) > MAX_FRAME_BYTES:
+            raise AudioRejected("Audio frame exceeds the decoding budget", status_code=413)
+        self.format_tag = tag
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.bits_per_sample = bits
+        self._freqs = self._np.fft.rfftfreq(self.frame_size, d=1.0 / sample_rate).astype("float32")
+
+    def _parse_header(self) -> bool:
+        """Consume header bytes from the buffer. Returns True once in the data chunk."""
+        while self._state != "data":
+            if self._skip:
+                n = min(self._skip, len(self._buf))
+                del self._buf[:n]
+                self._skip -= n
+                if self._skip:
+                    return False
+            if self._state == "riff":
+                if len(self._buf) < 12:
+                    return False
+                if self._buf[:4] != b"RIFF" or self._buf[8:12] != b"WAVE":
+                    raise AudioRejected("Only WAV (PCM) or raw 16-bit PCM audio is supported", status_code=415)
+                del self._buf[:12]
+                self._state = "chunk"
+                continue
+            if len(self._buf) < 8:
+                return False
+            chunk_id = bytes(self._buf[:4])
+            size = struct.unpack("<I", self._buf[4:8])[0]
+            if chunk_id == b"fmt ":
+                if size < 16 or size > 64:
+                    raise AudioRejected("Invalid WAV fmt chunk")
+                padded = size + (size & 1)
+                if len(self._buf) < 8 + padded:
+                    return False
+                tag, channels, rate, _, _, bits = struct.unpack("<HHIIHH", self._buf[8:24])
+                if tag == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                    tag = struct.unpack("<H", self._buf[32:34])[0]
+                self._set_format(tag, channels, rate, bits)
+                del self._buf[:8 + padded]
+            elif chunk_id == b"data":
+                if self.format_tag is None:
+                    raise AudioRejected("WAV data chunk before fmt chunk")
+                del self._buf[:8]
+                # Streamed WAVs often carry a 0 or 0xFFFFFFFF placeholder size
+                self._data_left = size if 0 < size < 0xFFFFFFFF else None
+                block = self.channels * (self.bits_per_sample // 8)
+                if self._data_left is not None and self._data_left / block / self.sample_rate > self.max_seconds:
+                    raise AudioRejected(f"Audio is longer than {self.max_seconds:.0f} seconds", status_code=413)
+                self._state = "data"
+            else:
+                del self._buf[:8]
+                self._skip = size + (size & 1)
+        return True
+
+    # -- sample decoding ------------------------------------------------
+
+    def _decode(self, data: bytes):
+        np = self._np
+        bits = self.bits_per_sample
+        if self.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+            samples = np.frombuffer(data, dtype="<f4")
+        elif bits == 8:
+            samples = (np.frombuffer(data, dtype="u1").astype("float32") - 128.0) / 128.0
+        elif bits == 16:
+            samples = np.frombuffer(data, dtype="<i2").astype("float32") / 32768.0
+        elif bits == 24:
+            b = np.frombuffer(data, dtype="u1").reshape(-1, 3).astype("int32")
+            ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+            ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+            samples = ints.astype("float32") / 8388608.0
+        else:
+            samples = np.frombuffer(data, dtype="<i4").astype("float32") / 2147483648.0
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        return samples
+
+    def _process_frames(self, frames):
+        """Update running statistics from an (n, frame_size) block of mono frames."""
+        np = self._np
+        eps = 1e-10
+        rms = np.sqrt((frames ** 2).mean(axis=1))
+        zcr = (np.diff(np.signbit(frames), axis=1) != 0).mean(axis=1)
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2
+        total = power.sum(axis=1) + eps
+        centroid = (power * self._freqs).sum(axis=1) / total
+        flatness = np.exp(np.log(power + eps).mean(axis=1)) / (power.mean(axis=1) + eps)
+        cumulative = np.cumsum(power, axis=1)
+        rolloff_idx = (cumulative < (ROLLOFF * total)[:, None]).sum(axis=1)
+        rolloff = self._freqs[np.minimum(rolloff_idx, self._freqs.size - 1)]
+
+        voiced = rms >= SILENCE_RMS
+        self._frames += frames.shape[0]
+        self._silent_frames += int((~voiced).sum())
+        self._clipped += int((np.abs(frames) >= CLIP_LEVEL).sum())
+        self._rms.update(rms)
+        self._zcr.update(zcr)
+        # Spectral shape is meaningless on silence
+        self._centroid.update(centroid[voiced])
+        self._flatness.update(flatness[voiced])
+        self._rolloff.update(rolloff[voiced])
+
+    def _drain(self, final: bool = False):
+        block = self.channels * (self.bits_per_sample // 8)
+        frame_bytes = self.frame_size * block
+        available = len(self._buf)
+        if self._data_left is not None:
+            available = min(available, self._data_left)
+        n_frames = available // frame_bytes
+        per_block = max(1, DECODE_BLOCK_BYTES // frame_bytes)
+        done = 0
+        while done < n_frames:
+            n = min(per_block, n_frames - done)
+            used = n * frame_bytes
+            samples = self._decode(bytes(self._buf[:used]))
+            del self._buf[:used]
+            if self._data_left is not None:
+                self._data_left -= used
+            self.samples += samples.size
+            self._process_frames(samples.reshape(n, self.frame_size))
+            done += n
+        if final:
+            tail = available - n_frames * frame_bytes
+            tail -= tail % block
+            if tail > 0:
+                samples = self._decode(bytes(self._buf[:tail]))
+                self.samples += samples.size
+                # Zero-pad the last partial frame only if it holds enough audio to mean anything
+                if samples.size >= self.frame_size // 4:
+                    frame = self._np.zeros(self.frame_size, dtype="float32")
+                    frame[:samples.size] = samples
+                    self._process_frames(frame[None, :])
+            self._buf.clear()
+        elif self._data_left == 0:
+            self._buf.clear()
+
+    # -- public API -----------------------------------------------------
+
+    def feed(self, chunk: bytes):
+        if not chunk:
+            return
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self.max_bytes:
+            raise AudioRejected(f"Audio exceeds {self.max_bytes} bytes", status_code=413)
+        if self._data_left == 0:
+            return  # trailing chunks after the audio data are ignored
+        self._buf.extend(chunk)
+        if self._state != "data" and not self._parse_header():
+            return
+        self._drain()
+        # Memory is constant, so length only costs CPU; bound it by duration, not bytes
+        if self.samples > self.max_seconds * self.sample_rate:
+            raise AudioRejected(f"Audio is longer than {self.max_seconds:.0f} seconds", status_code=413)
+
+    def finish(self) -> Dict[str, Any]:
+        if self._state != "data" or self.format_tag is None:
+            raise AudioRejected("Incomplete WAV header")
+        self._drain(final=True)
+        if not self.samples:
+            raise AudioRejected("Audio contains no samples")
+        rms = self._rms.summary()
+        return {
+            "container": self.container,
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "bits_per_sample": self.bits_per_sample,
+            "duration_seconds": self.samples / self.sample_rate,
+            "frame_size": self.frame_size,
+            "frames": self._frames,
+            "bytes_read": self.bytes_read,
+            "rms_mean": rms["mean"],
+            "rms_std": rms["std"],
+            "rms_max": rms["max"],
+            "zero_crossing_rate": self._zcr.summary()["mean"],
+            "spectral_centroid": self._centroid.summary(),
+            "spectral_flatness": self._flatness.summary(),
+            "spectral_rolloff": self._rolloff.summary(),
+            "silence_ratio": self._silent_frames / self._frames if self._frames else 1.0,
+            "clipping_ratio": self._clipped / self.samples,
+        }
@@ -0,0 +1,459 @@
+"""
+Tiered early-exit scoring cascade.
+
+Tier 0 ("cache") returns verdicts the full model already produced for the
+same text. Tier 1 ("heuristic") scores keyword hits and URL reputation and
+decides only when its calibrated fraud probability is outside the
+[CASCADE_BENIGN_THRESHOLD, CASCADE_FRAUD_THRESHOLD] band. Everything else
+escalates to tier 2 ("model"): TextClassifier for text. Fusion inputs
+(URLs) skip tier 1, whose thresholds are calibrated on SMS text only, but
+repeated bare URLs are served from cached FusionEngine verdicts. Metrics are
+kept separately for the text and fusion paths.
+
+Thresholds can be re-derived from a labeled CSV; they are picked on one
+split and the reported precision is measured on a held-out split:
+
+    python -m backend.integrations.cascade dataset/archive/spam.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import ipaddress
+import math
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlparse
+
+from backend.config import Config
+from backend.integrations.classifier import get_text_classifier
+from backend.integrations.fusion_wrapper import run_fusion
+
+TIER_CACHE = "cache"
+TIER_HEURISTIC = "heuristic"
+TIER_MODEL = "model"
+TIERS = (TIER_CACHE, TIER_HEURISTIC, TIER_MODEL)
+
+# Logistic bias: an input with no signals at all is confidently benign
+BIAS = -3.0
+
+# (signal, pattern, weight, fraud type, explanation)
+KEYWORD_SIGNALS: List[Tuple[str, "re.Pattern", float, str, str]] = [
+    ("prize", re.compile(r"\b(won|winner|win|prize|awarded|congratulations|congrats|lottery|jackpot|prize draw)\b", re.I),
+     1.8, "lottery_scam", "Claims you have won a prize"),
+    ("money", re.compile(r"(£|\$|₹|€|å£|\brs\.?\s?\d|\bcash\b|\bgift (card|voucher)s?\b|\breward\b|\bbonus\b)", re.I),
+     1.2, "financial_bait", "Mentions money, cash or vouchers"),
+    ("urgency", re.compile(r"\b(urgent|immediately|act now|expires?|final (notice|attempt)|last chance|within \d+ ?(hrs|hours|days))\b", re.I),
+     1.2, "urgency_pressure", "Uses urgency to pressure a quick response"),
+    ("credentials", re.compile(r"\b(verify|password|otp|pin|kyc|log ?in|bank details|account (is |has been )?(suspended|locked|blocked|limited))\b", re.I),
+     1.5, "phishing", "Asks for credentials or account verification"),
+    ("premium_contact", re.compile(r"\b(call|txt|text|reply|send|dial)\b[^.\n]{0,30}?\b\d{4,}\b|\b0?9\d{9}\b", re.I),
+     2.2, "premium_rate", "Pushes you to call or text a short or premium number"),
+    ("free_offer", re.compile(r"\bfree\b", re.I),
+     1.0, "financial_bait", "Offers something for free"),
+    ("claim", re.compile(r"\b(claim|redeem|collect)\b", re.I),
+     1.3, "lottery_scam", "Asks you to claim or redeem something"),
+    ("subscription", re.compile(r"\b(unsubscribe|opt.?out|tncs?|t&cs?|per (msg|week|min)|\d+p(pm)?|\d+\+|po ?box)\b", re.I),
+     1.4, "premium_rate", "Contains premium-rate subscription terms"),
+    ("promotion", re.compile(r"\b(ringtones?|tones?|logos?|nokia|mobiles?|txt|sms|freemsg|msg|chat(ting)?|dates?|dating|singles|sexy|xxx|adult|pics|offer|discount|latest|service|customer|\d+(st|nd|rd|th)? week)\b", re.I),
+     1.2, "spam_promotion", "Reads like unsolicited marketing"),
+    ("reply_keyword", re.compile(r"\b(reply|txt|text|send)\s+[A-Z]{2,}\b"),
+     1.5, "premium_rate", "Asks you to reply with a keyword"),
+    ("long_number", re.compile(r"\d{5,}"),
+     1.0, "premium_rate", "Contains a long number or short code"),
+    ("click_bait", re.compile(r"\b(click|tap|visit) (here|the link|below|now)\b", re.I),
+     1.2, "phishing", "Urges you to click a link"),
+]
+
+URL_PATTERN = re.compile(r"\b((?:https?://|www\.)[^\s<>\"']+|[a-z0-9-]+\.(?:com|net|org|biz|info|co\.uk|in|ly|xyz|top)\b[^\s]*)", re.I)
+URL_SHORTENERS = {"bit.ly", "tinyurl.com", "t.co", "goo.gl", "ow.ly", "is.gd", "cutt.ly", "rb.gy", "shorturl.at"}
+SUSPICIOUS_TLDS = {"xyz", "top", "tk", "ml", "ga", "cf", "gq", "biz", "click", "loan", "work", "info"}
+TRUSTED_DOMAINS = {
+    "google.com", "youtube.com", "amazon.com", "amazon.in", "microsoft.com", "apple.com",
+    "paypal.com", "github.com", "wikipedia.org", "hdfcbank.com", "icicibank.com", "sbi.co.in",
+}
+
+URL_WEIGHTS = {
+    "has_url": 1.5,
+    "url_shortener": 1.2,
+    "suspicious_tld": 1.2,
+    "ip_host": 1.5,
+    "trusted_domain": -1.5,
+}
+SHOUTING_WEIGHT = 0.6
+
+# Inputs that make a fusion request more than a bare URL lookup
+FUSION_PAYLOAD_KEYS = ("text", "content", "image", "audio_features", "amount", "transaction_id")
+
+
+def _sigmoid(z: float) -> float:
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def _host(url: str) -> str:
+    if "://" not in url:
+        url = "http://" + url
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def url_signals(urls: List[str]) -> Dict[str, bool]:
+    signals = {name: False for name in URL_WEIGHTS}
+    for url in urls:
+        host = _host(url)
+        if not host:
+            continue
+        signals["has_url"] = True
+        try:
+            ipaddress.ip_address(host)
+            signals["ip_host"] = True
+            continue
+        except ValueError:
+            pass
+        if host in URL_SHORTENERS:
+            signals["url_shortener"] = True
+        if host.rsplit(".", 1)[-1] in SUSPICIOUS_TLDS:
+            signals["suspicious_tld"] = True
+        # Exact match only: subdomains such as sites.google.com host user content
+        if host in TRUSTED_DOMAINS:
+            signals["trusted_domain"] = True
+    return signals
+
+
+def heuristic_score(text: str = "", url: Optional[str] = None) -> Tuple[float, Dict[str, bool], List[Tuple[str, str]]]:
+    """Cheap fraud probability for a message.
+
+    Returns (probability, detected signals, [(fraud type, explanation)]).
+    """
+    z = BIAS
+    detected: Dict[str, bool] = {}
+    reasons: List[Tuple[str, str]] = []
+    for name, pattern, weight, fraud_type, why in KEYWORD_SIGNALS:
+        hit = bool(text) and pattern.search(text) is not None
+        detected[name] = hit
+        if hit:
+            z += weight
+            reasons.append((fraud_type, why))
+
+    urls = URL_PATTERN.findall(text or "")
+    if url:
+        urls.append(url)
+    for name, hit in url_signals(urls).items():
+        detected[name] = hit
+        if hit:
+            z += URL_WEIGHTS[name]
+    if detected["url_shortener"] or detected["suspicious_tld"] or detected["ip_host"]:
+        reasons.append(("malicious_link", "Contains a link with poor reputation"))
+
+    letters = [c for c in text or "" if c.isalpha()]
+    shouting = len(letters) > 20 and sum(c.isupper() for c in letters) / len(letters) > 0.5
+    detected["shouting"] = shouting
+    if shouting:
+        z += SHOUTING_WEIGHT
+
+    return _sigmoid(z), detected, reasons
+
+
+def _risk_level(score: float) -> str:
+    if score >= 85:
+        return "CRITICAL"
+    if score >= 60:
+        return "HIGH"
+    if score >= 40:
+        return "MEDIUM"
+    if score >= 15:
+        return "LOW"
+    return "SAFE"
+
+
+class VerdictCache:
+    """Thread-safe LRU of full-model verdicts keyed by normalized text hash."""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            stored_at, verdict = item
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return dict(verdict)
+
+    def put(self, key: str, verdict: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.time(), dict(verdict))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CascadeMetrics:
+    """Per-tier traffic share and latency, with an estimate of time saved."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = {tier: 0 for tier in TIERS}
+            self._latency = {tier: 0.0 for tier in TIERS}
+            self._saved = 0.0
+
+    def record(self, tier: str, latency: float):
+        with self._lock:
+            self._counts[tier] += 1
+            self._latency[tier] += latency
+            if tier != TIER_MODEL and self._counts[TIER_MODEL]:
+                model_avg = self._latency[TIER_MODEL] / self._counts[TIER_MODEL]
+                self._saved += max(0.0, model_avg - latency)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                "total": total,
+                "tiers": {
+                    tier: {
+                        "count": self._counts[tier],
+                        "share": self._counts[tier] / total if total else 0.0,
+                        "avg_latency": self._latency[tier] / self._counts[tier] if self._counts[tier] else 0.0,
+                    }
+                    for tier in TIERS
+                },
+                "latency_saved": self._saved,
+            }
+
+
+class ScoringCascade:
+    def __init__(
+        self,
+        enabled: bool = Config.CASCADE_ENABLED,
+        benign_threshold: float = Config.CASCADE_BENIGN_THRESHOLD,
+        fraud_threshold: float = Config.CASCADE_FRAUD_THRESHOLD,
+    ):
+        self.enabled = enabled
+        self.benign_threshold = benign_threshold
+        self.fraud_threshold = fraud_threshold
+        self.cache = VerdictCache(Config.CASCADE_CACHE_SIZE, Config.CACHE_TTL)
+        self.fusion_cache = VerdictCache(Config.CASCADE_CACHE_SIZE, Config.CACHE_TTL)
+        # Kept apart so time saved on text is measured against TextClassifier alone
+        self.metrics = CascadeMetrics()
+        self.fusion_metrics = CascadeMetrics()
+
+    def _decides(self, probability: float, history: Optional[Dict[str, Any]] = None) -> bool:
+        if probability >= self.fraud_threshold:
+            return True
+        # Users with a record of fraud never exit early as benign; the model decides
+        return probability <= self.benign_threshold and not self._flagged(history)
+
+    @staticmethod
+    def _flagged(history: Optional[Dict[str, Any]]) -> bool:
+        """True if a risk_history profile shows enough past fraud to distrust cheap benign calls."""
+        if not history or not history.get("fraud_events"):
+            return False
+        return float(history.get("fraud_rate", 0.0)) >= Config.CASCADE_HISTORY_FRAUD_RATE
+
+    def _scale(self, probability: float) -> Tuple[float, float]:
+        """Map a decided heuristic probability to (risk score 0-100, confidence).
+
+        Benign decisions land in SAFE/LOW and fraud decisions in HIGH/CRITICAL,
+        so tier 1 verdicts line up with the model's score bands.
+        """
+        if probability >= self.fraud_threshold:
+            margin = (probability - self.fraud_threshold) / max(1e-9, 1.0 - self.fraud_threshold)
+            score = 60.0 + 40.0 * margin
+        else:
+            margin = 1.0 - probability / max(1e-9, self.benign_threshold)
+            score = 15.0 * (1.0 - margin)
+        # Thresholds are calibrated for ~99% precision; deeper inside the band is surer
+        return round(score, 2), round(0.9 + 0.1 * margin, 4)
+
+    def _heuristic_verdict(self, probability: float, detected: Dict[str, bool], reasons: List[Tuple[str, str]]) -> Dict[str, Any]:
+        is_fraud = probability >= self.fraud_threshold
+        score, confidence = self._scale(probability)
+        if is_fraud:
+            fraud_types = list(dict.fromkeys(t for t, _ in reasons))
+            why = [w for _, w in reasons]
+            actions = ["Do not reply or click any links", "Block and report the sender"]
+        else:
+            fraud_types, why = [], []
+            actions = ["No action needed"]
+        return {
+            "is_fraud": is_fraud,
+            "risk_score": score,
+            "risk_level": _risk_level(score),
+            "fraud_type": fraud_types,
+            "why_fraud": why,
+            "detected_signals": detected,
+            "link_intelligence": None,
+            "recommended_action": actions,
+            "confidence": confidence,
+        }
+
+    def classify(self, text: str, history: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Classify text, returning a TextClassifier-style dict plus the deciding 'tier'.
+
+        history is the sender's risk_history profile, if known.
+        """
+        start = time.time()
+        key = None
+        if self.enabled:
+            key = self.cache.key(text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return self._finish(cached, TIER_CACHE, start)
+            probability, detected, reasons = heuristic_score(text)
+            if self._decides(probability, history):
+                return self._finish(self._heuristic_verdict(probability, detected, reasons), TIER_HEURISTIC, start)
+
+        result = get_text_classifier().classify(text)
+        verdict = result.to_json()
+        if key is not None:
+            self.cache.put(key, verdict)
+        return self._finish(verdict, TIER_MODEL, start)
+
+    async def process(self, inputs: Dict[str, Any], fusion_strategy: str = "hybrid") -> Dict[str, Any]:
+        """Cache tier in front of run_fusion for bare URLs. Returns a fusion-style dict.
+
+        Heuristic thresholds are calibrated on SMS text only, so fusion inputs
+        never exit at tier 1. A URL's fusion verdict is reused for the cache
+        TTL; fallback verdicts are not cached.
+        """
+        start = time.time()
+        key = None
+        url = inputs.get("url")
+        if self.enabled and url and not any(inputs.get(k) for k in FUSION_PAYLOAD_KEYS):
+            key = hashlib.sha256(f"{fusion_strategy}:{url.strip()}".encode("utf-8")).hexdigest()
+            cached = self.fusion_cache.get(key)
+            if cached is not None:
+                return self._finish(cached, TIER_CACHE, start, self.fusion_metrics)
+
+        result = await run_fusion(inputs, fusion_strategy=fusion_strategy)
+        if key is not None and result.get("fusion_type") != "fallback":
+            self.fusion_cache.put(key, result)
+        return self._finish(result, TIER_MODEL, start, self.fusion_metrics)
+
+    def _finish(self, verdict: Dict[str, Any], tier: str, start: float, metrics: Optional["CascadeMetrics"] = None) -> Dict[str, Any]:
+        elapsed = time.time() - start
+        verdict["tier"] = tier
+        verdict["processing_time"] = elapsed
+        (metrics or self.metrics).record(tier, elapsed)
+        return verdict
+
+
+# global instance
+scoring_cascade = ScoringCascade()
+
+
+def _pick_thresholds(scored: List[Tuple[float, bool]], target_precision: float) -> Tuple[float, float]:
+    """Lowest fraud and highest benign threshold that meet target_precision on `scored`."""
+    candidates = sorted({p for p, _ in scored})
+
+    fraud_threshold = 1.0
+    for t in candidates:
+        picked = [is_spam for p, is_spam in scored if p >= t]
+        if picked and sum(picked) / len(picked) >= target_precision:
+            fraud_threshold = t
+            break
+
+    benign_threshold = 0.0
+    for t in reversed(candidates):
+        picked = [not is_spam for p, is_spam in scored if p <= t]
+        if picked and sum(picked) / len(picked) >= target_precision:
+            benign_threshold = t
+            break
+    return benign_threshold, fraud_threshold
+
+
+def _evaluate(scored: List[Tuple[float, bool]], benign_threshold: float, fraud_threshold: float) -> Dict[str, Any]:
+    total = len(scored)
+    fraud_hits = [is_spam for p, is_spam in scored if p >= fraud_threshold]
+    benign_hits = [not is_spam for p, is_spam in scored if p <= benign_threshold]
+    return {
+        "rows": total,
+        "benign_share": len(benign_hits) / total,
+        "benign_precision": sum(benign_hits) / len(benign_hits) if benign_hits else None,
+        "fraud_share": len(fraud_hits) / total,
+        "fraud_precision": sum(fraud_hits) / len(fraud_hits) if fraud_hits else None,
+        "escalated_share": 1.0 - (len(fraud_hits) + len(benign_hits)) / total,
+    }
+
+
+def calibrate(path: str, target_precision: float = 0.99, holdout: float = 0.3, seed: int = 0) -> Dict[str, Any]:
+    """Pick heuristic thresholds from a labeled CSV (label, text columns; spam/ham labels).
+
+    Rows are shuffled and split. On the calibration split the fraud threshold
+    is the lowest probability whose spam precision meets target_precision,
+    and the benign threshold the highest whose ham precision does. Precision
+    and the share of traffic each threshold decides are reported on the
+    held-out split, which is the number to trust: the keyword patterns were
+    written with spam.csv in view, so in-sample precision is optimistic.
+    """
+    scored: List[Tuple[float, bool]] = []
+    with open(path, encoding="latin-1", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) < 2 or row[0] not in ("spam", "ham"):
+                continue
+            probability, _, _ = heuristic_score(row[1])
+            scored.append((probability, row[0] == "spam"))
+    if not scored:
+        raise ValueError(f"No labeled rows found in {path}")
+    if not 0.0 < holdout < 1.0:
+        raise ValueError("holdout must be between 0 and 1")
+
+    random.Random(seed).shuffle(scored)
+    split = int(len(scored) * (1.0 - holdout))
+    calibration, held_out = scored[:split], scored[split:]
+
+    benign_threshold, fraud_threshold = _pick_thresholds(calibration, target_precision)
+    return {
+        "target_precision": target_precision,
+        "benign_threshold": round(benign_threshold, 6),
+        "fraud_threshold": round(fraud_threshold, 6),
+        "calibration": _evaluate(calibration, benign_threshold, fraud_threshold),
+        "held_out": _evaluate(held_out, benign_threshold, fraud_threshold),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate scoring cascade thresholds")
+    parser.add_argument("dataset", help="Labeled CSV with spam/ham in the first column and text in the second")
+    parser.add_argument("--precision", type=float, default=0.99, help="Required precision for early decisions")
+    parser.add_argument("--holdout", type=float, default=0.3, help="Fraction of rows held out for evaluation")
+    parser.add_argument("--seed", type=int, default=0, help="Shuffle seed for the split")
+    args = parser.parse_args()
+
+    report = calibrate(args.dataset, args.precision, args.holdout, args.seed)
+    for key, value in report.items():
+        if isinstance(value, dict):
+            print(f"{key}:")
+            for name, stat in value.items():
+                print(f"  {name}: {stat}")
+        else:
+            print(f"{key}: {value}")
+    print()
+    print(f"CASCADE_BENIGN_THRESHOLD={report['benign_threshold']}")
+    print(f"CASCADE_FRAUD_THRESHOLD={report['fraud_threshold']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_CLASSIFIER = None
+_CLASSIFIER_LOCK = threading.Lock()
+
+
+def get_text_classifier():
+    """Return a process-wide TextClassifier, creating it on first use.
+
+    Raises ImportError if the ai_modules package is not available.
+    """
+    global _CLASSIFIER
+    if _CLASSIFIER is None:
+        with _CLASSIFIER_LOCK:
+            if _CLASSIFIER is None:
+                # import dynamically to avoid startup import errors
+                from ai_modules.text_classifier import TextClassifier
+
+                _CLASSIFIER = TextClassifier()
+                logger.info("TextClassifier loaded")
+    return _CLASSIFIER
@@ -0,0 +1,142 @@
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+
+from backend.config import Config
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 64 * 1024
+ALLOWED_FORMATS = {"JPEG", "PNG", "GIF", "WEBP", "BMP"}
+
+
+class ImageRejected(ValueError):
+    """Raised when an upload violates the image byte/pixel budgets."""
+
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.status_code = status_code
+
+
+@dataclass(frozen=True)
+class ProcessedImage:
+    sha256: str
+    format: str
+    width: int
+    height: int
+    thumbnail: bytes  # PNG, thumbnail_size x thumbnail_size, no metadata
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "sha256": self.sha256,
+            "format": self.format,
+            "width": self.width,
+            "height": self.height,
+            "thumbnail_size": Config.IMAGE_THUMBNAIL_SIZE,
+        }
+
+
+class ThumbnailCache:
+    """Small thread-safe LRU of processed images keyed by content hash."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ProcessedImage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ProcessedImage]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                self._entries.move_to_end(key)
+            return item
+
+    def put(self, key: str, item: ProcessedImage):
+        with self._lock:
+            self._entries[key] = item
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# global instance
+thumbnail_cache = ThumbnailCache(Config.IMAGE_CACHE_SIZE)
+
+
+async def read_upload(file, max_bytes: int) -> bytes:
+    """Read an UploadFile in chunks, rejecting it as soon as it exceeds max_bytes."""
+    buf = bytearray()
+    while True:
+        chunk = await file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buf.extend(chunk)
+        if len(buf) > max_bytes:
+            raise ImageRejected(f"Image exceeds {max_bytes} bytes", status_code=413)
+    return bytes(buf)
+
+
+def process_image(data: bytes) -> ProcessedImage:
+    """Validate and downscale an uploaded image to a fixed-size thumbnail.
+
+    The header is checked before any pixel data is decoded. JPEGs are decoded
+    at reduced size via draft mode, and the output is re-encoded from pixels
+    only so EXIF and other metadata are dropped. CPU-bound; call it from a
+    worker thread.
+    """
+    if not data:
+        raise ImageRejected("Empty image upload")
+    if len(data) > Config.IMAGE_MAX_BYTES:
+        raise ImageRejected(f"Image exceeds {Config.IMAGE_MAX_BYTES} bytes", status_code=413)
+
+    digest = hashlib.sha256(data).hexdigest()
+    cached = thumbnail_cache.get(digest)
+    if cached is not None:
+        return cached
+
+    # Lazy import so the API still starts without Pillow installed
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    size = Config.IMAGE_THUMBNAIL_SIZE
+    try:
+        # open() only parses the header; nothing is decoded yet
+        img = Image.open(io.BytesIO(data))
+        fmt = img.format
+        if fmt not in ALLOWED_FORMATS:
+            raise ImageRejected(f"Unsupported image format: {fmt}", status_code=415)
+        width, height = img.size
+        if width <= 0 or height <= 0 or width * height > Config.IMAGE_MAX_PIXELS:
+            raise ImageRejected(
+                f"Image dimensions {width}x{height} exceed the {Config.IMAGE_MAX_PIXELS} pixel budget",
+                status_code=413,
+            )
+        img.draft("RGB", (size, size))
+        img.thumbnail((size, size), reducing_gap=2.0)
+        img = ImageOps.exif_transpose(img).convert("RGB")
+    except ImageRejected:
+        raise
+    except Image.DecompressionBombError as e:
+        raise ImageRejected(str(e), status_code=413)
+    except UnidentifiedImageError:
+        raise ImageRejected("Unreadable image", status_code=415)
+    except (OSError, ValueError, SyntaxError) as e:
+        raise ImageRejected(f"Corrupt image: {e}")
+
+    canvas = Image.new("RGB", (size, size))
+    canvas.paste(img, ((size - img.width) // 2, (size - img.height) // 2))
+    out = io.BytesIO()
+    canvas.save(out, format="PNG")
+
+    processed = ProcessedImage(
+        sha256=digest,
+        format=fmt,
+        width=width,
+        height=height,
+        thumbnail=out.getvalue(),
+    )
+    thumbnail_cache.put(digest, processed)
+    return processed
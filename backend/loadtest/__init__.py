@@ -0,0 +1 @@
+# load testing package
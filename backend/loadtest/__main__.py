@@ -0,0 +1,3 @@
+from backend.loadtest.runner import main
+
+main()
@@ -0,0 +1,130 @@
+"""
+Request payloads for load tests, built from the bundled datasets.
+"""
+
+import csv
+import io
+import math
+import random
+import re
+import struct
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Tuple
+
+DATASET_DIR = Path(__file__).resolve().parents[2] / "dataset"
+URL_RE = re.compile(r"https?://\S+")
+
+# route name -> (method, path)
+ROUTES: Dict[str, Tuple[str, str]] = {
+    "analyze_text": ("POST", "/api/v1/analyze/text"),
+    "ingest_text": ("POST", "/api/v1/ingest/text"),
+    "ingest_url": ("POST", "/api/v1/ingest/url"),
+    "ingest_image": ("POST", "/api/v1/ingest/image"),
+    "ingest_audio": ("POST", "/api/v1/ingest/audio"),
+    "ingest_audio_stream": ("POST", "/api/v1/ingest/audio/stream"),
+    "ingest_transaction": ("POST", "/api/v1/ingest/transaction"),
+}
+
+DEFAULT_MIX = {
+    "analyze_text": 4,
+    "ingest_text": 2,
+    "ingest_url": 1,
+    "ingest_image": 1,
+    "ingest_audio": 1,
+    "ingest_audio_stream": 1,
+    "ingest_transaction": 1,
+}
+
+
+def load_texts(limit: int = 2000) -> List[str]:
+    with open(DATASET_DIR / "archive" / "spam.csv", encoding="latin-1", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        texts = [row[1] for row in reader if len(row) > 1 and row[1].strip()]
+    return texts[:limit]
+
+
+def load_urls(limit: int = 500) -> List[str]:
+    urls: List[str] = []
+    with open(DATASET_DIR / "spam_texts.csv", encoding="utf-8", errors="replace", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) > 1:
+                urls.extend(URL_RE.findall(row[1]))
+    return urls[:limit] or ["https://example.com"]
+
+
+def load_images(limit: int = 50) -> List[bytes]:
+    paths = sorted((DATASET_DIR / "pic" / "train").glob("*/*.jpeg"))
+    random.Random(0).shuffle(paths)
+    return [p.read_bytes() for p in paths[:limit]]
+
+
+def make_wav(seconds: float, sample_rate: int = 16000, freq: float = 440.0) -> bytes:
+    """Mono 16-bit PCM tone; there is no audio dataset bundled with the repo."""
+    n = int(seconds * sample_rate)
+    samples = b"".join(
+        struct.pack("<h", int(12000 * math.sin(2 * math.pi * freq * i / sample_rate))) for i in range(n)
+    )
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(samples), b"WAVE", b"fmt ", 16, 1, 1,
+        sample_rate, sample_rate * 2, 2, 16, b"data", len(samples),
+    )
+    return header + samples
+
+
+class PayloadFactory:
+    """Builds httpx request kwargs for each route from the datasets."""
+
+    def __init__(self, seed: int = 0, users: int = 200, audio_seconds: Tuple[float, ...] = (1.0, 5.0, 30.0)):
+        self.rng = random.Random(seed)
+        self.users = [f"loadtest-user-{i}" for i in range(users)]
+        self.texts = load_texts()
+        self.urls = load_urls()
+        self.images = load_images()
+        self.audio = [make_wav(s, freq=220.0 * (i + 1)) for i, s in enumerate(audio_seconds)]
+        self._builders: Dict[str, Callable[[], Dict[str, Any]]] = {
+            "analyze_text": self._analyze_text,
+            "ingest_text": self._ingest_text,
+            "ingest_url": self._ingest_url,
+            "ingest_image": self._ingest_image,
+            "ingest_audio": self._ingest_audio,
+            "ingest_audio_stream": self._ingest_audio_stream,
+            "ingest_transaction": self._ingest_transaction,
+        }
+
+    def build(self, route: str) -> Dict[str, Any]:
+        return self._builders[route]()
+
+    def _user(self) -> str:
+        return self.rng.choice(self.users)
+
+    def _analyze_text(self):
+        return {"json": {"text": self.rng.choice(self.texts), "user_id": self._user()}}
+
+    def _ingest_text(self):
+        return {"json": {"source": "sms", "content": self.rng.choice(self.texts), "user_id": self._user()}}
+
+    def _ingest_url(self):
+        return {"json": {"url": self.rng.choice(self.urls), "user_id": self._user()}}
+
+    def _ingest_image(self):
+        image = self.rng.choice(self.images) if self.images else b""
+        return {"files": {"file": ("upload.jpeg", io.BytesIO(image), "image/jpeg")}}
+
+    def _ingest_audio(self):
+        return {"files": {"file": ("call.wav", io.BytesIO(self.rng.choice(self.audio)), "audio/wav")}}
+
+    def _ingest_audio_stream(self):
+        return {"content": self.rng.choice(self.audio), "params": {"filename": "call.wav"}}
+
+    def _ingest_transaction(self):
+        return {"json": {
+            "user_id": self._user(),
+            "transaction_id": f"tx-{self.rng.getrandbits(48):012x}",
+            "amount": round(self.rng.lognormvariate(4, 1.5), 2),
+            "currency": "USD",
+            "merchant": self.rng.choice(["grocer", "electronics", "crypto-exchange", "gift-cards"]),
+        }}
@@ -0,0 +1,287 @@
+"""
+HTTP load generator for backend.main:app.
+
+Examples (from the repository root):
+
+    # in-process, 32 concurrent clients for 20 s
+    python -m backend.loadtest --concurrency 32 --duration 20
+
+    # sweep 1, 2 and 4 uvicorn workers with 2 ms MongoDB latency
+    python -m backend.loadtest --workers 1,2,4 --mongo-latency-ms 2 --no-rate-limit
+
+    # an already running server (real stores, no loop-lag numbers)
+    python -m backend.loadtest --url http://127.0.0.1:8000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from backend.loadtest.payloads import PayloadFactory, ROUTES, DEFAULT_MIX
+from backend.loadtest.server import LAG_PATH, LoopLagMonitor, patched_app
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[rank]
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.exceptions = 0
+
+    def add(self, status: Optional[int], latency: float):
+        self.latencies.append(latency)
+        if status is None:
+            self.exceptions += 1
+        else:
+            self.statuses[status] += 1
+
+    def merge(self, other: "RouteStats"):
+        self.latencies.extend(other.latencies)
+        self.statuses.update(other.statuses)
+        self.exceptions += other.exceptions
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        total = len(self.latencies)
+        ordered = sorted(self.latencies)
+        errors = self.exceptions + sum(n for code, n in self.statuses.items() if code >= 500)
+        return {
+            "requests": total,
+            "throughput": total / duration if duration else 0.0,
+            **{f"p{p}": percentile(ordered, p) for p in PERCENTILES},
+            "max": ordered[-1] if ordered else 0.0,
+            "error_rate": errors / total if total else 0.0,
+            "rate_limited": self.statuses.get(429, 0) / total if total else 0.0,
+            "statuses": dict(self.statuses),
+        }
+
+
+async def drive(client, factory: PayloadFactory, mix: Dict[str, int], concurrency: int, duration: float) -> Dict[str, RouteStats]:
+    """Closed-loop load: `concurrency` clients each send the next request as soon as the last finishes."""
+    routes = [r for r, w in mix.items() if w > 0]
+    weights = [mix[r] for r in routes]
+    stats = {route: RouteStats() for route in routes}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            route = factory.rng.choices(routes, weights)[0]
+            method, path = ROUTES[route]
+            kwargs = factory.build(route)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = response.status_code
+            except Exception:
+                status = None
+            stats[route].add(status, time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return stats
+
+
+def _fresh_connections(url: str):
+    """Client that opens a new connection per request, so calls spread across workers."""
+    import httpx
+
+    return httpx.AsyncClient(base_url=url, timeout=5.0, limits=httpx.Limits(max_keepalive_connections=0))
+
+
+async def collect_lag(url: str, samples: int) -> List[Dict[str, Any]]:
+    """Ask workers for loop-lag reports; each call may land on a different worker."""
+    reports: Dict[int, Dict[str, Any]] = {}
+    async with _fresh_connections(url) as client:
+        for _ in range(samples):
+            try:
+                report = (await client.get(LAG_PATH)).json()
+                reports[report["pid"]] = report
+            except Exception:
+                break
+    return list(reports.values())
+
+
+async def reset_lag(url: str, samples: int):
+    async with _fresh_connections(url) as client:
+        for _ in range(samples):
+            try:
+                await client.post(LAG_PATH + "/reset")
+            except Exception:
+                break
+
+
+async def run_in_process(args, factory: PayloadFactory, mix: Dict[str, int]) -> Dict[str, Any]:
+    import httpx
+
+    monitor = LoopLagMonitor()
+    with patched_app(args.redis_latency_ms / 1000, args.mongo_latency_ms / 1000, args.no_rate_limit, monitor) as app:
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+                monitor.reset()
+                stats = await drive(client, factory, mix, args.concurrency, args.duration)
+    # Client and app share one loop here, so lag includes load-generator overhead
+    return {"stats": stats, "loop_lag": [monitor.report()]}
+
+
+async def run_against(url: str, args, factory: PayloadFactory, mix: Dict[str, int], workers: int) -> Dict[str, Any]:
+    import httpx
+
+    probes = max(1, workers) * 8
+    if workers:
+        await reset_lag(url, probes)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        stats = await drive(client, factory, mix, args.concurrency, args.duration)
+    lag = await collect_lag(url, probes) if workers else []
+    return {"stats": stats, "loop_lag": lag}
+
+
+def start_server(args, workers: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "LOADTEST_REDIS_LATENCY_MS": str(args.redis_latency_ms),
+        "LOADTEST_MONGO_LATENCY_MS": str(args.mongo_latency_ms),
+        "LOADTEST_NO_RATE_LIMIT": "1" if args.no_rate_limit else "0",
+    })
+    cmd = [
+        sys.executable, "-m", "uvicorn", "backend.loadtest.server:create_app", "--factory",
+        "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(workers), "--log-level", "warning",
+    ]
+    return subprocess.Popen(cmd, cwd=REPO_ROOT, env=env)
+
+
+async def wait_until_up(url: str, timeout: float = 60.0):
+    import httpx
+
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=2.0) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become healthy within {timeout:.0f}s")
+
+
+def summarize(label: str, result: Dict[str, Any], duration: float) -> Dict[str, Any]:
+    total = RouteStats()
+    for route_stats in result["stats"].values():
+        total.merge(route_stats)
+    lag = result["loop_lag"]
+    return {
+        "label": label,
+        "total": total.summary(duration),
+        "routes": {route: s.summary(duration) for route, s in result["stats"].items()},
+        "loop_lag": {
+            "workers_reporting": len(lag),
+            "mean": max((r["mean"] for r in lag), default=None),
+            "p99": max((r["p99"] for r in lag), default=None),
+            "max": max((r["max"] for r in lag), default=None),
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    ms = 1000.0
+    print(f"\n== {report['label']} ==")
+    header = f"{'route':<22}{'reqs':>8}{'req/s':>9}" + "".join(f"{'p' + str(p) + ' ms':>10}" for p in PERCENTILES)
+    header += f"{'max ms':>10}{'err%':>7}{'429%':>7}"
+    print(header)
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for route, s in rows:
+        line = f"{route:<22}{s['requests']:>8}{s['throughput']:>9.1f}"
+        line += "".join(f"{s['p' + str(p)] * ms:>10.1f}" for p in PERCENTILES)
+        line += f"{s['max'] * ms:>10.1f}{s['error_rate'] * 100:>7.1f}{s['rate_limited'] * 100:>7.1f}"
+        print(line)
+    lag = report["loop_lag"]
+    if lag["workers_reporting"]:
+        print(f"event-loop lag (worst of {lag['workers_reporting']} worker(s)): "
+              f"mean {lag['mean'] * ms:.2f} ms, p99 {lag['p99'] * ms:.2f} ms, max {lag['max'] * ms:.2f} ms")
+
+
+def parse_mix(value: Optional[str]) -> Dict[str, int]:
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in value.split(","):
+        route, _, weight = item.partition("=")
+        route = route.strip()
+        if route not in ROUTES:
+            raise argparse.ArgumentTypeError(f"Unknown route '{route}'. Choose from: {', '.join(ROUTES)}")
+        mix[route] = int(weight or 1)
+    return mix
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load test the fraud detection API")
+    parser.add_argument("--workers", default="0",
+                        help="Comma-separated uvicorn worker counts to sweep; 0 runs the app in-process (default: 0)")
+    parser.add_argument("--url", help="Target an already running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8765, help="Port for spawned servers")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--mix", type=parse_mix, default=None,
+                        help=f"Route weights, e.g. analyze_text=4,ingest_image=1. Routes: {', '.join(ROUTES)}")
+    parser.add_argument("--redis-latency-ms", type=float, default=0.5, help="Latency added to each Redis stand-in call")
+    parser.add_argument("--mongo-latency-ms", type=float, default=1.0, help="Latency added to each MongoDB stand-in call")
+    parser.add_argument("--no-rate-limit", action="store_true", help="Disable the per-IP rate limiters")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING", help="Log level for the app under test (default: WARNING)")
+    parser.add_argument("--json", action="store_true", help="Print reports as JSON")
+    args = parser.parse_args(argv)
+
+    # Configure before backend.main is imported so its basicConfig is a no-op
+    logging.basicConfig(level=args.log_level)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    mix = args.mix or dict(DEFAULT_MIX)
+    factory = PayloadFactory(seed=args.seed)
+    reports = []
+
+    if args.url:
+        result = asyncio.run(run_against(args.url, args, factory, mix, workers=0))
+        reports.append(summarize(args.url, result, args.duration))
+    else:
+        for workers in (int(w) for w in args.workers.split(",")):
+            if workers <= 0:
+                result = asyncio.run(run_in_process(args, factory, mix))
+                reports.append(summarize("in-process", result, args.duration))
+                continue
+            url = f"http://127.0.0.1:{args.port}"
+            server = start_server(args, workers)
+            try:
+                asyncio.run(wait_until_up(url))
+                result = asyncio.run(run_against(url, args, factory, mix, workers))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            reports.append(summarize(f"{workers} worker(s)", result, args.duration))
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            print_report(report)
+
+
+if __name__ == "__main__":
+    main()
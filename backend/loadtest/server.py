@@ -0,0 +1,170 @@
+"""
+App factory for load tests: backend.main:app wired to in-memory stores.
+
+Run it under uvicorn with several workers:
+
+    uvicorn backend.loadtest.server:create_app --factory --workers 4
+
+Settings come from the environment so every worker process picks them up:
+LOADTEST_REDIS_LATENCY_MS, LOADTEST_MONGO_LATENCY_MS, LOADTEST_NO_RATE_LIMIT.
+"""
+
+import asyncio
+import os
+import statistics
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, Dict, Any
+
+from backend.database.mongodb import mongodb_conn
+from backend.database.redis import redis_conn
+from backend.loadtest.standins import install_standins
+
+LAG_PATH = "/__loadtest/lag"
+
+# backend.main's own lifespan, before create_app wrapped it
+_BASE_LIFESPAN = None
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes up from a short sleep."""
+
+    def __init__(self, interval: float = 0.01, max_samples: int = 100000):
+        self.interval = interval
+        self.samples: deque = deque(maxlen=max_samples)
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            before = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - before - self.interval))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def reset(self):
+        self.samples.clear()
+
+    def report(self) -> Dict[str, Any]:
+        values = sorted(self.samples)
+        if not values:
+            return {"pid": os.getpid(), "samples": 0, "mean": 0.0, "p99": 0.0, "max": 0.0}
+        return {
+            "pid": os.getpid(),
+            "samples": len(values),
+            "mean": statistics.fmean(values),
+            "p99": values[min(len(values) - 1, int(len(values) * 0.99))],
+            "max": values[-1],
+        }
+
+
+def disable_rate_limits():
+    from backend.routers import analyze, ingest
+
+    analyze.RATE_LIMIT = ingest.RATE_LIMIT = 10 ** 12
+
+
+def create_app(
+    redis_latency: Optional[float] = None,
+    mongo_latency: Optional[float] = None,
+    no_rate_limit: Optional[bool] = None,
+    monitor: Optional[LoopLagMonitor] = None,
+):
+    """Return backend.main:app with stand-in stores and a loop-lag endpoint.
+
+    Arguments default to the LOADTEST_* environment variables. Latencies are
+    in seconds. Calling it again replaces the previous monitor and lag routes
+    rather than stacking them, but the patches stay in place; use
+    patched_app() when the process outlives the run.
+    """
+    global _BASE_LIFESPAN
+    if redis_latency is None:
+        redis_latency = float(os.environ.get("LOADTEST_REDIS_LATENCY_MS", "0")) / 1000
+    if mongo_latency is None:
+        mongo_latency = float(os.environ.get("LOADTEST_MONGO_LATENCY_MS", "0")) / 1000
+    if no_rate_limit is None:
+        no_rate_limit = os.environ.get("LOADTEST_NO_RATE_LIMIT") == "1"
+
+    # The stand-ins replace the real connections, so the lifespan must run them
+    os.environ.pop("SKIP_DB", None)
+    install_standins(redis_latency, mongo_latency)
+    if no_rate_limit:
+        disable_rate_limits()
+
+    from backend.main import app
+
+    monitor = monitor or LoopLagMonitor()
+    if _BASE_LIFESPAN is None:
+        _BASE_LIFESPAN = app.router.lifespan_context
+    inner = _BASE_LIFESPAN
+
+    @asynccontextmanager
+    async def lifespan(app_):
+        async with inner(app_) as state:
+            monitor.start()
+            try:
+                yield state
+            finally:
+                await monitor.stop()
+
+    app.router.lifespan_context = lifespan
+
+    async def loop_lag():
+        return monitor.report()
+
+    async def reset_loop_lag():
+        monitor.reset()
+        return {"pid": os.getpid(), "status": "reset"}
+
+    app.router.routes[:] = [r for r in app.router.routes if not getattr(r, "path", "").startswith(LAG_PATH)]
+    app.add_api_route(LAG_PATH, loop_lag, methods=["GET"], include_in_schema=False)
+    app.add_api_route(LAG_PATH + "/reset", reset_loop_lag, methods=["POST"], include_in_schema=False)
+    return app
+
+
+@contextmanager
+def patched_app(
+    redis_latency: float,
+    mongo_latency: float,
+    no_rate_limit: bool,
+    monitor: Optional[LoopLagMonitor] = None,
+):
+    """create_app() for one in-process run; undoes every patch on exit.
+
+    Restores the store connections, rate limits and their per-IP counters,
+    SKIP_DB, and the app's lifespan and routes, so consecutive runs in one
+    process start from the same state.
+    """
+    from backend.main import app
+    from backend.routers import analyze, ingest
+
+    stores = [(conn, dict(vars(conn))) for conn in (redis_conn, mongodb_conn)]
+    limits = (analyze.RATE_LIMIT, ingest.RATE_LIMIT)
+    skip_db = os.environ.get("SKIP_DB")
+    lifespan = app.router.lifespan_context
+    routes = list(app.router.routes)
+    try:
+        yield create_app(redis_latency, mongo_latency, no_rate_limit, monitor)
+    finally:
+        for conn, attrs in stores:
+            vars(conn).clear()
+            vars(conn).update(attrs)
+        analyze.RATE_LIMIT, ingest.RATE_LIMIT = limits
+        analyze._RATE_LIMIT_STORE.clear()
+        ingest._RATE_LIMIT_STORE.clear()
+        if skip_db is not None:
+            os.environ["SKIP_DB"] = skip_db
+        app.router.lifespan_context = lifespan
+        app.router.routes[:] = routes
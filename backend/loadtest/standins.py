@@ -0,0 +1,342 @@
+"""
+In-memory stand-ins for redis_conn and mongodb_conn.
+
+They implement only the calls the backend makes, and every call can be
+delayed by a fixed latency so load tests can model a remote store.
+"""
+
+import asyncio
+import copy
+import logging
+import time
+from typing import Optional, Dict, Any, List
+
+from backend.config import Config
+from backend.database.mongodb import mongodb_conn
+from backend.database.redis import redis_conn
+
+logger = logging.getLogger(__name__)
+
+
+class FakeRedis:
+    """Subset of redis.asyncio.Redis used by RedisConnection."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+
+    async def _delay(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _alive(self, key: str) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and time.monotonic() > expires:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    async def ping(self):
+        await self._delay()
+        return True
+
+    async def get(self, key: str):
+        await self._delay()
+        return self._data.get(key) if self._alive(key) else None
+
+    async def set(self, key: str, value, ex: Optional[int] = None):
+        await self._delay()
+        self._data[key] = value
+        if ex:
+            self._expires[key] = time.monotonic() + ex
+        else:
+            self._expires.pop(key, None)
+        return True
+
+    async def setex(self, key: str, ttl: int, value):
+        return await self.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str):
+        await self._delay()
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return removed
+
+    async def aclose(self):
+        self._data.clear()
+        self._expires.clear()
+
+
+# -- MongoDB ------------------------------------------------------------
+
+def _get_path(doc: Dict[str, Any], path: str):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return None
+        doc = doc[part]
+    return doc
+
+
+def _set_path(doc: Dict[str, Any], path: str, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+_COMPARATORS = {
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$ne": lambda a, b: a != b,
+}
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for path, cond in query.items():
+        value = _get_path(doc, path)
+        if isinstance(cond, dict) and cond and all(k in _COMPARATORS for k in cond):
+            if not all(_COMPARATORS[op](value, arg) for op, arg in cond.items()):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        return out
+    for key, value in projection.items():
+        if not value:
+            doc.pop(key, None)
+    return doc
+
+
+def _expr(doc: Dict[str, Any], expr):
+    """Evaluate the tiny subset of aggregation expressions the backend uses."""
+    if isinstance(expr, str) and expr.startswith("$"):
+        return _get_path(doc, expr[1:])
+    if isinstance(expr, dict) and "$cond" in expr:
+        test, then, other = expr["$cond"]
+        return _expr(doc, then) if _expr(doc, test) else _expr(doc, other)
+    return expr
+
+
+class FakeCursor:
+    def __init__(self, docs: List[Dict[str, Any]], latency: float):
+        self._docs = docs
+        self._latency = latency
+
+    def sort(self, key: str, direction: int = 1):
+        self._docs.sort(key=lambda d: (_get_path(d, key) is None, _get_path(d, key)), reverse=direction < 0)
+        return self
+
+    def limit(self, n: int):
+        if n:
+            self._docs = self._docs[:n]
+        return self
+
+    async def to_list(self, length: Optional[int] = None):
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return self._docs[:length] if length else list(self._docs)
+
+
+class FakeCollection:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.docs: List[Dict[str, Any]] = []
+        self.indexes: Dict[str, Dict[str, Any]] = {}
+        # unique single-field indexes: field -> {value: doc}, so lookups stay O(1) under load
+        self._unique: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        self._next_id = 0
+
+    async def _delay(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def create_index(self, keys, **kwargs):
+        await self._delay()
+        if isinstance(keys, str):
+            keys = [(keys, 1)]
+        name = "_".join(f"{k}_{d}" for k, d in keys)
+        self.indexes[name] = {"keys": list(keys), **kwargs}
+        if kwargs.get("unique") and len(keys) == 1:
+            field = keys[0][0]
+            self._unique[field] = {_get_path(d, field): d for d in self.docs}
+        return name
+
+    def _first(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if len(query) == 1:
+            (field, value), = query.items()
+            if field in self._unique and not isinstance(value, dict):
+                return self._unique[field].get(value)
+        return next((d for d in self.docs if _matches(d, query)), None)
+
+    def _add(self, doc: Dict[str, Any]):
+        self.docs.append(doc)
+        for field, lookup in self._unique.items():
+            lookup[_get_path(doc, field)] = doc
+
+    async def insert_one(self, doc: Dict[str, Any]):
+        await self._delay()
+        doc = copy.deepcopy(doc)
+        if "_id" not in doc:
+            self._next_id += 1
+            doc["_id"] = self._next_id
+        self._add(doc)
+        return doc["_id"]
+
+    async def find_one(self, query: Dict[str, Any], projection: Optional[Dict[str, Any]] = None):
+        await self._delay()
+        doc = self._first(query)
+        return _project(doc, projection) if doc is not None else None
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None):
+        docs = [_project(d, projection) for d in self.docs if _matches(d, query or {})]
+        return FakeCursor(docs, self.latency)
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        await self._delay()
+        target = self._apply_update(query, update, upsert)
+        return target["_id"] if target is not None else None
+
+    async def find_one_and_update(
+        self,
+        query: Dict[str, Any],
+        update: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        upsert: bool = False,
+        return_document: bool = False,
+    ):
+        """return_document=True matches pymongo's ReturnDocument.AFTER."""
+        await self._delay()
+        before = self._first(query)
+        before = copy.deepcopy(before) if before is not None else None
+        target = self._apply_update(query, update, upsert)
+        doc = target if return_document else before
+        return _project(doc, projection) if doc is not None else None
+
+    def _apply_update(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool) -> Optional[Dict[str, Any]]:
+        target = self._first(query)
+        if target is None:
+            if not upsert:
+                return None
+            target = {k: v for k, v in query.items() if not isinstance(v, dict)}
+            self._next_id += 1
+            target["_id"] = self._next_id
+            for path, value in update.get("$setOnInsert", {}).items():
+                _set_path(target, path, copy.deepcopy(value))
+            self._add(target)
+        for path, value in update.get("$set", {}).items():
+            _set_path(target, path, copy.deepcopy(value))
+        for path, value in update.get("$inc", {}).items():
+            _set_path(target, path, (_get_path(target, path) or 0) + value)
+        for path, value in update.get("$max", {}).items():
+            current = _get_path(target, path)
+            if current is None or value > current:
+                _set_path(target, path, value)
+        return target
+
+    def aggregate(self, pipeline: List[Dict[str, Any]]):
+        docs = [copy.deepcopy(d) for d in self.docs]
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if _matches(d, spec)]
+            elif op == "$group":
+                docs = self._group(docs, spec)
+            elif op == "$project":
+                docs = [_project(d, spec) for d in docs]
+            elif op == "$sort":
+                for key, direction in reversed(list(spec.items())):
+                    docs.sort(key=lambda d: _get_path(d, key), reverse=direction < 0)
+            elif op == "$limit":
+                docs = docs[:spec]
+            else:
+                raise NotImplementedError(f"Aggregation stage {op} is not supported by the stand-in")
+        return FakeCursor(docs, self.latency)
+
+    @staticmethod
+    def _group(docs: List[Dict[str, Any]], spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+        groups: Dict[Any, List[Dict[str, Any]]] = {}
+        for doc in docs:
+            groups.setdefault(_expr(doc, spec["_id"]), []).append(doc)
+        out = []
+        for key, members in groups.items():
+            row = {"_id": key}
+            for field, acc in spec.items():
+                if field == "_id":
+                    continue
+                (op, arg), = acc.items()
+                values = [_expr(d, arg) for d in members]
+                numbers = [v for v in values if v is not None]
+                if op == "$sum":
+                    row[field] = sum(numbers)
+                elif op == "$avg":
+                    row[field] = sum(numbers) / len(numbers) if numbers else None
+                elif op == "$max":
+                    row[field] = max(numbers) if numbers else None
+                elif op == "$min":
+                    row[field] = min(numbers) if numbers else None
+                else:
+                    raise NotImplementedError(f"Accumulator {op} is not supported by the stand-in")
+            out.append(row)
+        return out
+
+
+class FakeDatabase:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(self.latency)
+        return self._collections[name]
+
+
+class FakeMongoClient:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._databases: Dict[str, FakeDatabase] = {}
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        if name not in self._databases:
+            self._databases[name] = FakeDatabase(self.latency)
+        return self._databases[name]
+
+    def close(self):
+        self._databases.clear()
+
+
+def install_standins(redis_latency: float = 0.0, mongo_latency: float = 0.0):
+    """Make redis_conn/mongodb_conn connect to in-memory stand-ins.
+
+    Latencies are in seconds and added to every store call. Must run before
+    the app lifespan starts.
+    """
+    async def connect_redis():
+        redis_conn.client = FakeRedis(redis_latency)
+        logger.info(f"Using in-memory Redis stand-in ({redis_latency * 1000:.1f} ms latency)")
+
+    async def connect_mongodb():
+        mongodb_conn.client = FakeMongoClient(mongo_latency)
+        mongodb_conn.db = mongodb_conn.client[Config.MONGODB_DATABASE]
+        logger.info(f"Using in-memory MongoDB stand-in ({mongo_latency * 1000:.1f} ms latency)")
+
+    redis_conn.connect = connect_redis
+    mongodb_conn.connect = connect_mongodb
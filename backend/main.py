@@ -1,18 +1,36 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-from backend.routers.ingest import router as ingest_router
-from backend.routers.analyze import router as analyze_router
+from backend.startup import startup_report, import_module
+
+with startup_report.phase("import fastapi", kind="import"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse
+with startup_report.phase("import routers", kind="import"):
+    from backend.routers.ingest import router as ingest_router
+    from backend.routers.analyze import router as analyze_router
+    from backend.routers.stream import router as stream_router, text_batcher
 from contextlib import asynccontextmanager
 import logging
-from backend.database.mongodb import mongodb_conn
-from backend.database.redis import redis_conn
+with startup_report.phase("import database", kind="import"):
+    from backend.database.mongodb import mongodb_conn
+    from backend.database.redis import redis_conn
+    from backend.database.risk_history import risk_history
+from backend.integrations.classifier import get_text_classifier
 # Note: simple in-app rate limiting implemented in router for demo
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Loaded in the background after startup; readiness waits for these
+WARMUP_STEPS = {
+    "load text classifier": get_text_classifier,
+    "import fusion engine": import_module("fusion_engine.fusion_engine"),
+    "import numpy": import_module("numpy"),
+    "import Pillow": import_module("PIL.Image"),
+}
+# Steps that may fail and still leave the app ready (degraded); the rest must succeed
+OPTIONAL_WARMUP_STEPS = {"import fusion engine", "import numpy", "import Pillow"}
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
@@ -21,42 +39,56 @@ async def lifespan(app: FastAPI):
         # Allow skipping DB connects in test mode
         import os
         if os.environ.get('SKIP_DB') != '1':
-            await mongodb_conn.connect()
-            await redis_conn.connect()
+            with startup_report.phase("connect mongodb"):
+                await mongodb_conn.connect()
+            with startup_report.phase("connect redis"):
+                await redis_conn.connect()
             logger.info("Database connections established successfully")
+            try:
+                with startup_report.phase("ensure indexes"):
+                    await risk_history.ensure_indexes()
+            except Exception as e:
+                logger.warning(f"Could not ensure risk history indexes: {e}")
         else:
             logger.info("SKIP_DB set — skipping DB connects for testing")
     except Exception as e:
         logger.error(f"Failed to establish database connections: {e}")
         raise
 
+    startup_report.start_warmup(WARMUP_STEPS, optional=OPTIONAL_WARMUP_STEPS)
+    logger.info(f"Serving after {startup_report.elapsed():.3f}s; loading models in the background")
+
     yield
 
     # Shutdown
     logger.info("Shutting down the application...")
+    await startup_report.stop()
+    await text_batcher.close()
     await redis_conn.close()
     await mongodb_conn.close()
     logger.info("Database connections closed")
 
-app = FastAPI(
-    title="AI Fraud Detection API",
-    description="Backend API for AI-powered fraud detection system",
-    version="1.0.0",
-    lifespan=lifespan
-)
-
-# Basic security / CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(ingest_router)
-app.include_router(analyze_router)
+with startup_report.phase("create app"):
+    app = FastAPI(
+        title="AI Fraud Detection API",
+        description="Backend API for AI-powered fraud detection system",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    # Basic security / CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Include routers
+    app.include_router(ingest_router)
+    app.include_router(analyze_router)
+    app.include_router(stream_router)
 
 @app.get("/")
 async def root():
@@ -66,5 +98,42 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/live")
+async def liveness():
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness():
+    """Ready once background model loading has finished; failed optional modules are listed as degraded."""
+    body = {"ready": startup_report.ready, "degraded": sorted(startup_report.failures)}
+    return JSONResponse(body, status_code=200 if startup_report.ready else 503)
+
+@app.get("/debug/startup")
+async def startup_breakdown():
+    """Import-time and startup-phase breakdown"""
+    return startup_report.as_dict()
+
+
+async def _print_startup_report():
+    async with app.router.lifespan_context(app):
+        await startup_report.wait_ready()
+    print(startup_report.format())
+
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="AI Fraud Detection API")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Run startup and model loading, print the phase breakdown and exit")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if args.startup_report:
+        asyncio.run(_print_startup_report())
+    else:
+        import uvicorn
+
+        uvicorn.run(app, host=args.host, port=args.port)
@@ -7,10 +7,13 @@ import asyncio
 import logging
 import time
 from typing import Dict, Any, Optional, List, Union
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from pydantic import BaseModel, Field, validator
 from datetime import datetime
 
+from backend.integrations.cascade import scoring_cascade
+from backend.database.risk_history import risk_history
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/analyze", tags=["analyze"])
@@ -88,6 +91,7 @@ class TextAnalyzeResponse(BaseModel):
     recommended_action: List[str]
     confidence: float
     processing_time: float
+    tier: Optional[str] = None  # cascade tier that decided: cache, heuristic or model
     timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
 
 
@@ -133,6 +137,7 @@ def log_analysis(request: Dict[str, Any], response: Dict[str, Any]):
 async def analyze_text(
     payload: TextAnalyzeRequest,
     request: Request,
+    background: BackgroundTasks,
     _rl: None = Depends(rate_limiter)
 ) -> TextAnalyzeResponse:
     """
@@ -143,25 +148,24 @@ async def analyze_text(
         # Sanitize input
         text = sanitize_text(payload.text)
         
-        # Import classifier
-        from ai_modules.text_classifier import TextClassifier
-        
-        # Initialize and classify
-        # V2: No arguments needed for init
-        classifier = TextClassifier()
-        result = classifier.classify(text)
-        
-        # Build response using to_json() (which returns dict)
-        response_data = result.to_json()
+        # Cheap tiers decide clear-cut messages; the rest go to the classifier.
+        # A sender with a history of fraud always reaches the classifier.
+        history = await risk_history.get_profile(payload.user_id)
+        # A worker thread keeps the loop free while the model loads or runs
+        response_data = await asyncio.to_thread(scoring_cascade.classify, text, history)
         response_data["timestamp"] = datetime.utcnow().isoformat()
-        response_data["processing_time"] = result.processing_time
         
         # Log analysis for dataset expansion
         log_analysis(payload.dict(), response_data)
+        background.add_task(
+            risk_history.record, payload.user_id, response_data["risk_score"],
+            response_data["is_fraud"], "analyze", model_version=response_data["tier"]
+        )
         
         logger.info(
             f"Analyzed text: is_fraud={response_data['is_fraud']}, "
             f"score={response_data['risk_score']}, "
+            f"tier={response_data['tier']}, "
             f"time={float(response_data.get('processing_time', 0)):.3f}s"
         )
         
@@ -187,6 +191,18 @@ async def health_check() -> HealthResponse:
     return HealthResponse()
 
 
+@router.get("/cascade/metrics")
+async def get_cascade_metrics():
+    """Per-tier traffic share and latency for the scoring cascade"""
+    return {
+        "enabled": scoring_cascade.enabled,
+        "benign_threshold": scoring_cascade.benign_threshold,
+        "fraud_threshold": scoring_cascade.fraud_threshold,
+        **scoring_cascade.metrics.snapshot(),
+        "fusion": scoring_cascade.fusion_metrics.snapshot(),
+    }
+
+
 @router.get("/log")
 async def get_analysis_log():
     """Get analysis log (for debugging/dataset export)"""
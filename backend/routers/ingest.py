@@ -1,16 +1,24 @@
 import asyncio
 import logging
 import time
-import tempfile
 import os
 from typing import Optional, Dict, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, BackgroundTasks
 from fastapi.responses import JSONResponse
 
+from backend.config import Config
 from backend.models import schemas
 from backend.integrations.fusion_wrapper import run_fusion
-from ai_modules.text_classifier import TextClassifier, RiskLevel
+from backend.integrations.audio_features import (
+    AudioRejected,
+    StreamingAudioAnalyzer,
+    RAW_PCM_EXTENSIONS,
+    READ_CHUNK_SIZE as AUDIO_READ_CHUNK_SIZE,
+)
+from backend.integrations.image_pipeline import ImageRejected, process_image, read_upload
+from backend.integrations.cascade import scoring_cascade
+from backend.database.risk_history import risk_history
 
 logger = logging.getLogger(__name__)
 
@@ -54,29 +62,30 @@ async def ingest_text(payload: schemas.TextIngestRequest, background: Background
     start = time.time()
     try:
         content = sanitize_text(payload.content)
-        # Use NLP classifier for text analysis
-        # V2: No init args
-        classifier = TextClassifier()
-        result = classifier.classify(content)
-        
-        risk_score = result.risk_score
+        history = await risk_history.get_profile(payload.user_id)
+        # Cheap tiers decide clear-cut messages; the rest go to the NLP classifier.
+        # A worker thread keeps the loop free while the model loads or runs.
+        result = await asyncio.to_thread(scoring_cascade.classify, content, history)
+
+        risk_score = result['risk_score']
         alert = None
-        
+
         # Determine alert based on is_fraud flag
-        if result.is_fraud:
-            alert = f"FRAUD DETECTED! Level: {result.risk_level}"
-            if result.risk_score > 80:
+        if result['is_fraud']:
+            alert = f"FRAUD DETECTED! Level: {result['risk_level']}"
+            if risk_score > 80:
                  alert += " (High Confidence)"
-            background.add_task(trigger_alert, alert, {"user_id": payload.user_id, "risk": result.risk_level})
+            background.add_task(trigger_alert, alert, {"user_id": payload.user_id, "risk": result['risk_level']})
+        background.add_task(risk_history.record, payload.user_id, risk_score, result['is_fraud'], "text", model_version=result['tier'])
 
         processing_time = time.time() - start
         
         return schemas.IngestResponse(
             risk_score=risk_score,
-            confidence=result.confidence,
+            confidence=result['confidence'],
             processing_time=processing_time,
             alert=alert,
-            details=result.to_json()
+            details=result
         )
     except HTTPException:
         raise
@@ -92,7 +101,8 @@ async def ingest_url(payload: schemas.UrlIngestRequest, background: BackgroundTa
         # Basic sanitization of URL
         url = payload.url.strip()
         inputs = {"url": url, "metadata": payload.metadata, "user_id": payload.user_id}
-        result = await run_fusion(inputs)
+        inputs["user_history"] = await risk_history.get_profile(payload.user_id)
+        result = await scoring_cascade.process(inputs)
         processing_time = result.get('processing_time', time.time() - start)
         score = float(result.get('risk_score', 0.0))
         confidence = float(result.get('confidence', 0.0))
@@ -100,6 +110,8 @@ async def ingest_url(payload: schemas.UrlIngestRequest, background: BackgroundTa
         if score >= 85:
             alert = "FRAUD DETECTED! Pattern matches known scam"
             background.add_task(trigger_alert, alert, {"user_id": payload.user_id, "score": score, "url": url})
+        background.add_task(risk_history.record, payload.user_id, score, alert is not None, "url",
+                            model_version=result.get('tier', 'fusion'))
 
         return schemas.IngestResponse(risk_score=score, confidence=confidence, processing_time=processing_time, alert=alert, details=result)
 
@@ -111,18 +123,13 @@ async def ingest_url(payload: schemas.UrlIngestRequest, background: BackgroundTa
 @router.post("/image", response_model=schemas.IngestResponse)
 async def ingest_image(file: UploadFile = File(...), background: BackgroundTasks = None, _rl=Depends(rate_limiter)):
     start = time.time()
-    tmp_path = None
     try:
-        # Temporary file handling
-        suffix = os.path.splitext(file.filename)[1] or ".img"
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-        tmp_path = tmp.name
-        content = await file.read()
-        tmp.write(content)
-        tmp.flush()
-        tmp.close()
-
-        inputs = {"image": content, "metadata": {"filename": file.filename}}
+        content = await read_upload(file, Config.IMAGE_MAX_BYTES)
+        # Decode off the event loop; fusion only ever sees the bounded thumbnail
+        image = await asyncio.to_thread(process_image, content)
+        del content
+
+        inputs = {"image": image.thumbnail, "metadata": {"filename": file.filename, "image": image.describe()}}
         result = await run_fusion(inputs)
         processing_time = result.get('processing_time', time.time() - start)
         score = float(result.get('risk_score', 0.0))
@@ -135,52 +142,84 @@ async def ingest_image(file: UploadFile = File(...), background: BackgroundTasks
 
         return schemas.IngestResponse(risk_score=score, confidence=confidence, processing_time=processing_time, alert=alert, details=result)
 
+    except ImageRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except ImportError as e:
+        logger.error(f"Image processing unavailable: {e}")
+        raise HTTPException(status_code=503, detail="Image processing unavailable")
     except Exception as e:
         logger.exception(f"Error ingesting image: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                os.remove(tmp_path)
-            except Exception:
-                logger.debug(f"Failed to remove temp file {tmp_path}")
+
+
+async def _score_audio(analyzer: StreamingAudioAnalyzer, filename: Optional[str], background: Optional[BackgroundTasks], start: float):
+    features = await asyncio.to_thread(analyzer.finish)
+    inputs = {"audio_features": features, "metadata": {"filename": filename}}
+    result = await run_fusion(inputs)
+    processing_time = result.get('processing_time', time.time() - start)
+    score = float(result.get('risk_score', 0.0))
+    confidence = float(result.get('confidence', 0.0))
+    alert = None
+    if score >= 85:
+        alert = "FRAUD DETECTED! Pattern matches known scam"
+        if background:
+            background.add_task(trigger_alert, alert, {"filename": filename, "score": score})
+
+    return schemas.IngestResponse(risk_score=score, confidence=confidence, processing_time=processing_time, alert=alert, details=result)
 
 
 @router.post("/audio", response_model=schemas.IngestResponse)
 async def ingest_audio(file: UploadFile = File(...), background: BackgroundTasks = None, _rl=Depends(rate_limiter)):
     start = time.time()
-    tmp_path = None
     try:
-        suffix = os.path.splitext(file.filename)[1] or ".wav"
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-        tmp_path = tmp.name
-        content = await file.read()
-        tmp.write(content)
-        tmp.flush()
-        tmp.close()
-
-        inputs = {"audio": content, "metadata": {"filename": file.filename}}
-        result = await run_fusion(inputs)
-        processing_time = result.get('processing_time', time.time() - start)
-        score = float(result.get('risk_score', 0.0))
-        confidence = float(result.get('confidence', 0.0))
-        alert = None
-        if score >= 85:
-            alert = "FRAUD DETECTED! Pattern matches known scam"
-            if background:
-                background.add_task(trigger_alert, alert, {"filename": file.filename, "score": score})
+        suffix = os.path.splitext(file.filename or "")[1].lower()
+        analyzer = StreamingAudioAnalyzer(raw=suffix in RAW_PCM_EXTENSIONS)
+        while True:
+            chunk = await file.read(AUDIO_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            # FFT work stays off the event loop, like process_image
+            await asyncio.to_thread(analyzer.feed, chunk)
+
+        return await _score_audio(analyzer, file.filename, background, start)
+
+    except AudioRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except ImportError as e:
+        logger.error(f"Audio processing unavailable: {e}")
+        raise HTTPException(status_code=503, detail="Audio processing unavailable")
+    except Exception as e:
+        logger.exception(f"Error ingesting audio: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
 
-        return schemas.IngestResponse(risk_score=score, confidence=confidence, processing_time=processing_time, alert=alert, details=result)
 
+@router.post("/audio/stream", response_model=schemas.IngestResponse)
+async def ingest_audio_stream(
+    request: Request,
+    background: BackgroundTasks,
+    filename: Optional[str] = None,
+    raw: bool = False,
+    sample_rate: Optional[int] = None,
+    channels: int = 1,
+    _rl=Depends(rate_limiter),
+):
+    """Score a WAV (or raw 16-bit PCM with raw=true) request body while it is still uploading."""
+    start = time.time()
+    try:
+        analyzer = StreamingAudioAnalyzer(raw=raw, sample_rate=sample_rate, channels=channels)
+        async for chunk in request.stream():
+            await asyncio.to_thread(analyzer.feed, chunk)
+
+        return await _score_audio(analyzer, filename, background, start)
+
+    except AudioRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except ImportError as e:
+        logger.error(f"Audio processing unavailable: {e}")
+        raise HTTPException(status_code=503, detail="Audio processing unavailable")
     except Exception as e:
-        logger.exception(f"Error ingesting audio: {e}")
+        logger.exception(f"Error ingesting audio stream: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                os.remove(tmp_path)
-            except Exception:
-                logger.debug(f"Failed to remove temp file {tmp_path}")
 
 
 @router.post("/transaction", response_model=schemas.IngestResponse)
@@ -193,7 +232,8 @@ async def ingest_transaction(payload: schemas.TransactionIngestRequest, backgrou
             "amount": payload.amount,
             "currency": payload.currency,
             "merchant": payload.merchant,
-            "metadata": payload.metadata
+            "metadata": payload.metadata,
+            "user_history": await risk_history.get_profile(payload.user_id),
         }
         result = await run_fusion(inputs)
         processing_time = result.get('processing_time', time.time() - start)
@@ -203,6 +243,9 @@ async def ingest_transaction(payload: schemas.TransactionIngestRequest, backgrou
         if score >= 85:
             alert = "FRAUD DETECTED! Pattern matches known scam"
             background.add_task(trigger_alert, alert, {"transaction_id": payload.transaction_id, "score": score})
+        background.add_task(risk_history.record, payload.user_id, score, alert is not None, "transaction",
+                            model_version=result.get('fusion_type', 'fusion'), transaction_id=payload.transaction_id,
+                            features={"amount": payload.amount})
 
         return schemas.IngestResponse(risk_score=score, confidence=confidence, processing_time=processing_time, alert=alert, details=result)
 
@@ -0,0 +1,230 @@
+"""
+Streaming Analysis API Router
+Provides a WebSocket endpoint for real-time chat scanning
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from backend.integrations.cascade import scoring_cascade
+from backend.config import Config
+from backend.routers.analyze import sanitize_text, log_analysis, MAX_TEXT_LENGTH
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/stream", tags=["stream"])
+
+# Per-connection flow control: messages accepted but not yet answered
+MAX_IN_FLIGHT = 32
+
+# Micro-batching into the classifier
+BATCH_SIZE = 16
+BATCH_WAIT = 0.005  # seconds to wait for a batch to fill
+QUEUE_SIZE = 512  # pending messages across all connections
+
+
+def _classify_batch(texts: List[str]) -> List[Any]:
+    """Classify a batch of texts; failures are returned in place of results."""
+    results: List[Any] = []
+    for text in texts:
+        try:
+            results.append(scoring_cascade.classify(text))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class MicroBatcher:
+    """Collects messages from all connections and classifies them in batches.
+
+    The classifier runs in a worker thread so the event loop keeps reading
+    frames while a batch is being scored.
+    """
+
+    def __init__(self, max_batch: int = BATCH_SIZE, max_wait: float = BATCH_WAIT, max_queue: int = QUEUE_SIZE):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, text: str) -> Dict[str, Any]:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        # Blocks when the shared queue is full, pushing back on readers
+        await self._queue.put((text, future))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            texts = [text for text, _ in batch]
+            try:
+                results = await asyncio.to_thread(_classify_batch, texts)
+            except Exception as e:
+                results = [e] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._worker = None
+
+
+# global instance
+text_batcher = MicroBatcher()
+
+
+class TokenBucket:
+    """Per-connection message budget: `rate` messages per second with bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+class FrameError(ValueError):
+    def __init__(self, detail: str, msg_id: Any = None):
+        super().__init__(detail)
+        self.msg_id = msg_id
+
+
+def parse_frame(raw: str) -> Tuple[Any, str]:
+    """Parse an inbound frame into (id, text). Raises FrameError if invalid."""
+    try:
+        frame = json.loads(raw)
+    except json.JSONDecodeError:
+        raise FrameError("Frame is not valid JSON")
+    if not isinstance(frame, dict):
+        raise FrameError("Frame must be a JSON object")
+    msg_id = frame.get("id")
+    if msg_id is None:
+        raise FrameError("Frame is missing 'id'")
+    text = frame.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise FrameError("Text cannot be empty or whitespace only", msg_id)
+    if len(text) > MAX_TEXT_LENGTH:
+        raise FrameError(f"Text exceeds {MAX_TEXT_LENGTH} characters", msg_id)
+    return msg_id, sanitize_text(text)
+
+
+@router.websocket("/text")
+async def stream_text(websocket: WebSocket):
+    """
+    Analyze chat messages over a single WebSocket connection.
+
+    Clients send {"id": ..., "text": ...} frames and receive
+    {"id": ..., "type": "result", "result": {...}} frames as each verdict
+    finishes, not necessarily in the order sent. At most MAX_IN_FLIGHT
+    messages are accepted per connection; further frames are not read until
+    a verdict is sent back. Each connection may send STREAM_MESSAGE_RATE
+    messages per second (bursts up to STREAM_MESSAGE_BURST); messages over
+    budget get an error frame.
+    """
+    await websocket.accept()
+    budget = TokenBucket(Config.STREAM_MESSAGE_RATE, Config.STREAM_MESSAGE_BURST)
+    window = asyncio.Semaphore(MAX_IN_FLIGHT)
+    send_lock = asyncio.Lock()
+    pending: set = set()
+
+    async def send(frame: Dict[str, Any]):
+        async with send_lock:
+            await websocket.send_json(frame)
+
+    async def handle(msg_id: Any, text: str):
+        start = time.time()
+        try:
+            result = await text_batcher.submit(text)
+            result["timestamp"] = datetime.utcnow().isoformat()
+            log_analysis({"text": text}, result)
+            frame = {"id": msg_id, "type": "result", "result": result, "latency": time.time() - start}
+        except ImportError as e:
+            logger.error(f"Failed to import text classifier: {e}")
+            frame = {"id": msg_id, "type": "error", "detail": "Classification service unavailable"}
+        except Exception as e:
+            logger.exception(f"Error analyzing streamed text: {e}")
+            frame = {"id": msg_id, "type": "error", "detail": "Internal server error"}
+        try:
+            await send(frame)
+        except Exception:
+            logger.debug(f"Could not deliver verdict for message {msg_id}; connection closed")
+        finally:
+            window.release()
+
+    try:
+        await send({"type": "ready", "max_in_flight": MAX_IN_FLIGHT})
+        while True:
+            await window.acquire()
+            try:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                if message.get("text") is None:
+                    raise FrameError("Binary frames are not supported; send JSON text frames")
+                msg_id, text = parse_frame(message["text"])
+                if not budget.take():
+                    raise FrameError("Too many requests. Please try again later.", msg_id)
+            except FrameError as e:
+                window.release()
+                await send({"id": e.msg_id, "type": "error", "detail": str(e)})
+                continue
+            except BaseException:
+                window.release()
+                raise
+            task = asyncio.create_task(handle(msg_id, text))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+    except WebSocketDisconnect:
+        logger.debug("Stream client disconnected")
+    finally:
+        for task in list(pending):
+            task.cancel()
@@ -0,0 +1,128 @@
+"""
+Startup timing and readiness tracking.
+
+Import this module first so the clock starts as early as possible.
+"""
+
+import asyncio
+import importlib
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+_T0 = time.perf_counter()
+
+
+class StartupReport:
+    """Records how long each import/startup phase took and whether models are ready."""
+
+    def __init__(self):
+        self.phases: List[Dict[str, Any]] = []
+        self.failures: Dict[str, str] = {}
+        self.ready = False
+        self.ready_at: Optional[float] = None
+        self._warmup: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def elapsed() -> float:
+        return time.perf_counter() - _T0
+
+    @contextmanager
+    def phase(self, name: str, kind: str = "startup"):
+        start = time.perf_counter()
+        modules = len(sys.modules)
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            entry = {
+                "name": name,
+                "kind": kind,
+                "started_at": start - _T0,
+                "duration": time.perf_counter() - start,
+                "modules_loaded": len(sys.modules) - modules,
+            }
+            if error:
+                entry["error"] = error
+            self.phases.append(entry)
+
+    def mark_ready(self):
+        self.ready = True
+        self.ready_at = self.elapsed()
+        logger.info(f"Ready after {self.ready_at:.3f}s")
+
+    def start_warmup(self, steps: Dict[str, Callable[[], Any]], optional: Iterable[str] = ()):
+        """Run blocking warm-up steps in a worker thread, then mark the app ready.
+
+        A failing step is recorded as a failure instead of stopping startup.
+        Steps named in `optional` only degrade the features that need them;
+        if any other step fails the app stays not ready.
+        """
+        optional = set(optional)
+
+        async def run():
+            required_failed = False
+            for name, step in steps.items():
+                try:
+                    with self.phase(name, kind="warmup"):
+                        await asyncio.to_thread(step)
+                except Exception as e:
+                    self.failures[name] = f"{type(e).__name__}: {e}"
+                    if name in optional:
+                        logger.warning(f"Optional warm-up step '{name}' failed: {e}")
+                    else:
+                        required_failed = True
+                        logger.error(f"Warm-up step '{name}' failed; staying not ready: {e}")
+            if not required_failed:
+                self.mark_ready()
+
+        self._warmup = asyncio.create_task(run())
+        return self._warmup
+
+    async def wait_ready(self):
+        if self._warmup is not None:
+            await self._warmup
+
+    async def stop(self):
+        if self._warmup is not None and not self._warmup.done():
+            self._warmup.cancel()
+            try:
+                await self._warmup
+            except asyncio.CancelledError:
+                pass
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "uptime": self.elapsed(),
+            "ready": self.ready,
+            "ready_at": self.ready_at,
+            "failures": dict(self.failures),
+            "phases": list(self.phases),
+        }
+
+    def format(self) -> str:
+        lines = [f"{'phase':<40}{'kind':<9}{'start ms':>10}{'took ms':>10}{'modules':>9}"]
+        for p in self.phases:
+            line = f"{p['name']:<40}{p['kind']:<9}{p['started_at'] * 1000:>10.1f}{p['duration'] * 1000:>10.1f}{p['modules_loaded']:>9}"
+            if "error" in p:
+                line += f"  ! {p['error']}"
+            lines.append(line)
+        ready = f"{self.ready_at * 1000:.1f} ms" if self.ready_at is not None else "not ready"
+        lines.append(f"ready: {ready}")
+        return "\n".join(lines)
+
+
+def import_module(name: str):
+    """Warm-up step helper: import a module by name."""
+    return lambda: importlib.import_module(name)
+
+
+# global instance
+startup_report = StartupReport()